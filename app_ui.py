@@ -1,27 +1,45 @@
 
 # app_ui.py
-import os, sys, random
+import os, sys, time
 import tkinter as tk
-from tkinter import messagebox, scrolledtext
+from tkinter import filedialog, messagebox, scrolledtext
 import pygame
 
 from simulation import PLANET_DATA, SOLAR_SYSTEM, WHITE, BLACK
-
-class AstronomyApp:
-    def __init__(self, root):
+from render_worker import RenderWorker
+from results_view import VirtualList
+from session import SimulationSession, APPROACH_ALERT_AU
+from quality import QualityGovernor, TIERS
+
+CATALOG_COLUMNS = [("Name", 110), ("Type", 80), ("Orbit", 70), ("Period", 80)]
+APPROACH_COLUMNS = [("Day", 80), ("Body", 90), ("Passed", 90), ("Min AU", 80)]
+EVENT_COLUMNS = [("Day", 80), ("Event", 170), ("Bodies", 200), ("Angle", 60)]
+EVENT_SEARCH_DAYS = 3 * 365
+QUALITY_STATUS_EVERY = 15  # frames between quality readouts in the status bar
+
+class AstronomyApp(SimulationSession):
+    def __init__(self, root, scheduler=None, threaded_render=True, star_seed=None):
+        super().__init__(star_seed)
         self.root = root
+        self.scheduler = scheduler  # frame_scheduler.FrameScheduler, or None for root.after pacing
+        self.threaded_render = threaded_render
+        self.renderer = None  # render_worker.RenderWorker once pygame is up
+        self._renderer_size = None  # last size posted to the renderer; it applies it between frames
+        # Budget for inline frames: the scheduler's pace, or update_pygame's 30 ms. init_pygame
+        # switches it to the render worker's pace when frames are drawn there.
+        self.governor = QualityGovernor(budget_ms=1000 / scheduler.target_fps if scheduler else 30.0)
+        self._frames_drawn = 0
         self.root.title("✨ Celestial Body Finder - Interactive Solar System ✨")
         self.root.geometry("1400x900")
         self.root.configure(bg="#0b0f1a")
 
-        self.time_factor = 0.5
-        self.is_paused = False
         self.pygame_initialized = False
 
         self.setup_ui()
         self.init_pygame()
 
         self.select_object("earth")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def setup_ui(self):
         title_frame = tk.Frame(self.root, bg="#0b0f1a")
@@ -42,6 +60,9 @@ class AstronomyApp:
         self.create_simulation_panel(content_frame)
         self.create_status_bar()
 
+        self.root.bind("<Control-s>", lambda e: self.save_snapshot_dialog())
+        self.root.bind("<Control-o>", lambda e: self.load_snapshot_dialog())
+
     def create_search_frame(self):
         search_frame = tk.Frame(self.root, bg="#0b0f1a")
         search_frame.pack(pady=8)
@@ -70,7 +91,7 @@ class AstronomyApp:
             tk.Button(button_frame, text=body, font=("Arial", 10, "bold"),
                       bg=colors[i], fg="black" if body in ["Sun", "Venus"] else "white",
                       width=9, height=1,
-                      command=lambda name=body.lower(): self.select_object(name)).pack(side="left", padx=3)
+                      command=lambda name=body.lower(): self.on_pick(name)).pack(side="left", padx=3)
 
     def create_control_panel(self):
         control_frame = tk.Frame(self.root, bg="#1c2230", relief="ridge", bd=2)
@@ -93,12 +114,31 @@ class AstronomyApp:
         btn_frame = tk.Frame(control_frame, bg="#1c2230")
         btn_frame.pack(side="right", padx=20)
 
+        quality_frame = tk.Frame(control_frame, bg="#1c2230")
+        quality_frame.pack(side="left", padx=10)
+
+        tk.Label(quality_frame, text="Quality:", font=("Arial", 11, "bold"),
+                 fg="white", bg="#1c2230").pack(side="left")
+
+        self.quality_var = tk.StringVar(value="Auto")
+        quality_menu = tk.OptionMenu(quality_frame, self.quality_var, "Auto",
+                                     *(tier.name for tier in TIERS), command=self.on_quality_choice)
+        quality_menu.config(font=("Arial", 10), bg="#0b0f1a", fg="white", highlightthickness=0,
+                            activebackground="#1c2230", activeforeground="#00e6ff", width=7)
+        quality_menu.pack(side="left", padx=5)
+
         tk.Button(btn_frame, text="⏸️ Pause", font=("Arial", 10, "bold"),
                   command=self.toggle_pause, bg="#ff6b6b", fg="white", width=8).pack(side="left", padx=5)
 
         tk.Button(btn_frame, text="🔁 Reset", font=("Arial", 10, "bold"),
                   command=self.reset_simulation, bg="#4ecdc4", fg="black", width=8).pack(side="left", padx=5)
 
+        tk.Button(btn_frame, text="☄️ Approaches", font=("Arial", 10, "bold"),
+                  command=self.show_approaches, bg="#f4a460", fg="black", width=11).pack(side="left", padx=5)
+
+        tk.Button(btn_frame, text="🔭 Events", font=("Arial", 10, "bold"),
+                  command=self.show_upcoming_events, bg="#b39ddb", fg="black", width=8).pack(side="left", padx=5)
+
         tk.Button(btn_frame, text="ℹ️ About", font=("Arial", 10, "bold"),
                   command=self.show_about, bg="#45b7d1", fg="white", width=8).pack(side="left", padx=5)
 
@@ -120,6 +160,13 @@ class AstronomyApp:
                                                      insertbackground="white",
                                                      relief="flat", padx=10, pady=10)
         self.result_text.pack(fill="both", expand=True)
+        self.result_text.tag_configure("title", foreground="#00e6ff", font=("Consolas", 11, "bold"))
+        self.result_text.tag_configure("highlight", foreground="#ffcc00")
+        self._shown_info = None
+
+        # Shown instead of result_text for multi-row results; only visible rows are materialised.
+        self.result_list = VirtualList(info_frame, CATALOG_COLUMNS, on_select=self.on_result_row)
+        self._approaches_seen = 0
 
     def create_simulation_panel(self, parent):
         right_frame = tk.Frame(parent, bg="#0b0f1a", width=700, height=650)
@@ -140,9 +187,14 @@ class AstronomyApp:
                  font=("Arial", 10), fg="#ffffff", bg="#0b0f1a").pack()
 
     def create_status_bar(self):
-        self.status = tk.Label(self.root, text="Ready - Select a celestial body to begin exploration",
+        status_frame = tk.Frame(self.root, bg="#1c2230")
+        status_frame.pack(fill="x", side="bottom")
+        self.quality_label = tk.Label(status_frame, text=self.governor.status(), anchor="e",
+                                      font=("Arial", 10), bg="#1c2230", fg="#8899aa")
+        self.quality_label.pack(side="right", padx=8, ipady=3)
+        self.status = tk.Label(status_frame, text="Ready - Select a celestial body to begin exploration",
                                anchor="w", font=("Arial", 10), bg="#1c2230", fg="#00e6ff")
-        self.status.pack(fill="x", side="bottom", ipady=3)
+        self.status.pack(fill="x", side="left", expand=True, ipady=3)
 
     def init_pygame(self):
         try:
@@ -155,67 +207,225 @@ class AstronomyApp:
                                                    self.pygame_frame.winfo_height()))
             pygame.display.set_caption("Solar System Simulation")
             self.pygame_initialized = True
-            self.update_pygame()
+            if self.threaded_render:
+                self.renderer = RenderWorker(self.simulate_frame, self.screen.get_size(),
+                                             handle_input=self.on_render_input)
+                self.renderer.start()
+                self._renderer_size = self.renderer.size
+                # The governor is fed the worker's render times, so hold the worker's pace.
+                self.governor.budget_ms = self.renderer.frame_interval * 1000
+            if self.scheduler is not None:
+                self.scheduler.set_frame_callback(self.render_frame)
+            else:
+                self.update_pygame()
         except Exception as e:
             messagebox.showerror("Pygame Error", f"Could not initialize Pygame: {str(e)}")
 
     def on_search(self, event=None):
         query = self.search_var.get().strip().lower()
         if query:
-            self.select_object(query)
+            self.send_input("search", query)
+            self.show_selection(query)
             self.search_var.set("")
 
+    def on_pick(self, name):
+        self.select_object(name)
+
     def select_object(self, name):
-        if name in SOLAR_SYSTEM:
-            obj = SOLAR_SYSTEM[name]
+        self.send_input("select", name)
+        self.show_selection(name)
+
+    def show_selection(self, name):
+        obj = SOLAR_SYSTEM.get(name)
+        if obj is not None:
             self.display_object_info(obj)
-            self.highlight_object(obj)
             self.status.config(text=f"Selected: {obj.name} - {obj.get_info().split('Type: ')[1].split('\n')[0]}")
         else:
-            self.result_text.delete("1.0", tk.END)
-            self.result_text.insert(tk.END, f"Object '{name}' not found.\n\nAvailable objects:\n" +
-                                    "\n".join([f"• {body}" for body in SOLAR_SYSTEM.keys()]))
+            self.show_result_rows(self.catalog_rows(), f"Object '{name}' not found.\n\nAvailable objects:",
+                                  CATALOG_COLUMNS)
             self.status.config(text=f"Object '{name}' not found")
 
-    def display_object_info(self, obj):
-        self.result_text.delete("1.0", tk.END)
-        info = obj.get_info()
-        self.result_text.insert(tk.END, info)
+    def catalog_rows(self):
+        for body in SOLAR_SYSTEM.values():
+            body_type = body.get_info().split("Type: ")[1].split("\n")[0]
+            yield (body.name, body_type, body.orbit_distance, body.orbital_period)
+
+    def show_result_rows(self, rows, caption="", columns=CATALOG_COLUMNS):
+        if self.result_text.winfo_manager():
+            self.result_text.pack_forget()
+            self.result_list.pack(fill="both", expand=True)
+        self._shown_info = None
+        self.result_list.set_columns(columns)
+        self.result_list.set_rows([], caption=caption)
+        self.result_list.stream_rows(rows)
+
+    def on_result_row(self, row):
+        # Catalog rows start with a body name; approach and event rows start with the day.
+        columns = self.result_list.columns
+        if columns == CATALOG_COLUMNS:
+            name = row[0]
+        elif columns == EVENT_COLUMNS:
+            name = row[2].split(" / ")[-1]
+        else:
+            name = row[1]
+        self.on_pick(name.lower())
+
+    def show_approaches(self):
+        events = list(self.approach_events)  # filled by the render worker
+        caption = (f"Close approaches within {APPROACH_ALERT_AU} AU (scene scale), newest first."
+                   if events else f"No approaches within {APPROACH_ALERT_AU} AU yet.")
+        self.show_result_rows(reversed(events), caption, APPROACH_COLUMNS)
+
+    def show_upcoming_events(self):
+        from events import find_events
+        start = self.sim_days
+        if self.scheduler is None:
+            self.on_events_found(start, find_events(start, start + EVENT_SEARCH_DAYS))
+        elif self.scheduler.submit(find_events, start, start + EVENT_SEARCH_DAYS,
+                                   on_done=lambda events: self.on_events_found(start, events)):
+            self.status.config(text=f"🔭 Searching events from day {start:,.0f}…")
+        else:
+            self.status.config(text="🔭 Too many background jobs queued; try again shortly")
 
-        self.result_text.tag_configure("title", foreground="#00e6ff", font=("Consolas", 11, "bold"))
-        self.result_text.tag_configure("highlight", foreground="#ffcc00")
+    def on_events_found(self, start, events):
+        caption = (f"{len(events)} conjunctions, oppositions, elongations and alignments "
+                   f"from day {start:,.0f} to {start + EVENT_SEARCH_DAYS:,.0f}.")
+        self.show_result_rows((e.as_row() for e in events), caption, EVENT_COLUMNS)
+        self.status.config(text=f"🔭 {len(events)} events in the next {EVENT_SEARCH_DAYS:,} days")
 
-        lines = info.split('\n')
-        for i, line in enumerate(lines):
+    def display_object_info(self, obj):
+        if self.result_list.winfo_manager():
+            self.result_list.cancel_stream()
+            self.result_list.pack_forget()
+            self.result_text.pack(fill="both", expand=True)
+        if obj is self._shown_info:
+            return
+        self._shown_info = obj
+
+        self.result_text.delete("1.0", tk.END)
+        for line in obj.get_info().split('\n'):
             if line.startswith("Name:"):
-                self.result_text.tag_add("title", f"1.0", f"1.{len(line)}")
+                tag = "title"
             elif "Description:" in line:
-                start_idx = f"{i+1}.0"
-                self.result_text.tag_add("highlight", start_idx, f"{i+1}.end")
-
-    def highlight_object(self, selected_obj):
-        from simulation import PLANET_DATA
-        for body in PLANET_DATA:
-            body.is_highlighted = (body == selected_obj)
-
-    def set_time_factor(self, value):
-        self.time_factor = float(value)
+                tag = "highlight"
+            else:
+                tag = ()
+            self.result_text.insert(tk.END, line + "\n", tag)
 
     def toggle_pause(self):
-        self.is_paused = not self.is_paused
-        if self.is_paused:
+        paused = not self.is_paused
+        self.send_input("pause")
+        if paused:
             self.time_scale.set(0)
         else:
             self.time_scale.set(0.5)
 
     def reset_simulation(self):
-        from simulation import PLANET_DATA
-        for body in PLANET_DATA:
-            body.angle = 0
+        self.send_input("reset")
         self.time_scale.set(0.5)
-        self.time_factor = 0.5
-        self.is_paused = False
-        self.select_object("earth")
+        self.show_selection("earth")
+
+    # ---------- input ----------
+    def send_input(self, kind, *args):
+        """
+        Apply a user input through SimulationSession.apply_input. While the render worker
+        runs the state is its own, so the input is posted and applied (and recorded) there at
+        the next frame boundary; the selection reply comes back through poll().
+        """
+        if self.renderer is not None:
+            self.renderer.post(("input", kind, args))
+            return None
+        return self.apply_input(kind, *args)
+
+    def set_time_factor(self, value):
+        self.send_input("time", float(value))
+
+    def set_quality(self, tier):
+        self.send_input("quality", tier.name)
+
+    # ---------- recording ----------
+    def start_recording(self, path):
+        """Record this session's input for session_replay.py, starting at a frame boundary."""
+        if self.renderer is not None:
+            self.renderer.post(("record", path))
+        else:
+            self.on_recording_started(*self.begin_recording(path))
+
+    def begin_recording(self, path):
+        import session_replay
+        try:
+            session_replay.start_recording(self, path, self.screen.get_size() if self.renderer is None
+                                           else self.renderer.size)
+        except OSError as e:
+            return path, str(e)
+        return path, None
+
+    def on_recording_started(self, path, error):
+        if error is not None:
+            messagebox.showerror("Recording", f"Could not record to {path}:\n{error}")
+
+    def stop_recording(self):
+        """Finish the recording. The final checksum is taken with the render worker stopped,
+        so it matches the frame the replay ends on; only call this when closing the app."""
+        import session_replay
+        if self.recorder is None:
+            return
+        if self.renderer is not None:
+            self.renderer.stop()
+            self.renderer.join(timeout=1.0)
+        session_replay.stop_recording(self)
+
+    # ---------- snapshots ----------
+    def save_snapshot_dialog(self):
+        path = filedialog.asksaveasfilename(title="Save simulation snapshot", defaultextension=".cbsnap",
+                                            filetypes=[("Simulation snapshot", "*.cbsnap")])
+        if path:
+            self.save_snapshot(path)
+
+    def load_snapshot_dialog(self):
+        path = filedialog.askopenfilename(title="Restore simulation snapshot",
+                                          filetypes=[("Simulation snapshot", "*.cbsnap")])
+        if path:
+            self.load_snapshot(path)
+
+    def save_snapshot(self, path):
+        self.snapshot_op("save", path)
+
+    def load_snapshot(self, path):
+        self.snapshot_op("load", path)
+
+    def snapshot_op(self, op, path):
+        if self.renderer is not None:
+            self.renderer.post((op, path))  # state belongs to the render worker while it runs
+        else:
+            self.on_snapshot_done(*self.run_snapshot_op(op, path))
+
+    def run_snapshot_op(self, op, path):
+        import snapshot
+        try:
+            if op == "save":
+                snapshot.save(self, path)
+            else:
+                self.record("load", path)
+                snapshot.load(self, path)
+        except (OSError, ValueError, KeyError) as e:
+            return op, path, str(e)
+        return op, path, None
+
+    def on_snapshot_done(self, op, path, error):
+        if error is not None:
+            messagebox.showerror("Snapshot", f"Could not {op} {path}:\n{error}")
+            return
+        if op == "load":
+            self.time_scale.set(self.time_factor)
+            self.governor.index = TIERS.index(self.quality)
+            if self.governor.pinned:
+                self.quality_var.set(self.quality.name)
+            selected = next((body for body in PLANET_DATA if body.is_highlighted), None)
+            if selected is not None:
+                self.display_object_info(selected)
+        verb = "Saved" if op == "save" else "Restored"
+        self.status.config(text=f"💾 {verb} day {self.sim_days:,.0f} snapshot: {os.path.basename(path)}")
 
     def show_about(self):
         about_text = """
@@ -238,16 +448,20 @@ Educational tool for astronomy enthusiasts and students!
         messagebox.showinfo("About Celestial Body Finder", about_text.strip())
 
     def handle_click(self, pos):
-        from simulation import PLANET_DATA
-        for body in PLANET_DATA:
-            if body.is_clicked(pos):
-                self.select_object(body.name.lower())
-                return True
-        return False
+        name = self.send_input("click", *pos)
+        if name is None:
+            return False
+        self.show_selection(name)
+        return True
 
     def update_pygame(self):
         if not self.pygame_initialized:
             return
+        self.root.after(30 if self.render_frame() else 1000, self.update_pygame)
+
+    def render_frame(self):
+        if not self.pygame_initialized:
+            return False
 
         try:
             import pygame
@@ -258,32 +472,74 @@ Educational tool for astronomy enthusiasts and students!
                     if event.button == 1:
                         self.handle_click(event.pos)
 
-            self.screen.fill(BLACK)
-
-            self.draw_stars()
-
-            center_x, center_y = self.screen.get_width() / 2, self.screen.get_height() / 2
-
-            from simulation import PLANET_DATA
-            for body in PLANET_DATA:
-                if not self.is_paused:
-                    body.update_position(self.time_factor, center_x, center_y)
-                body.draw(self.screen, center_x, center_y)
+            if self.renderer is not None:
+                self.present_worker_frame()
+            else:
+                start = time.perf_counter()
+                self.simulate_frame(self.screen)
+                self.observe_frame((time.perf_counter() - start) * 1000)
+                self.report_new_approaches()
 
             pygame.display.flip()
-            self.root.after(30, self.update_pygame)
+            return True
 
         except Exception as e:
             print(f"Pygame update error: {e}")
-            self.root.after(1000, self.update_pygame)
-
-    def draw_stars(self):
-        for _ in range(50):
-            x = random.randint(0, self.screen.get_width())
-            y = random.randint(0, self.screen.get_height())
-            brightness = random.randint(100, 255)
-            import pygame
-            pygame.draw.circle(self.screen, (brightness, brightness, brightness), (x, y), 1)
+            return False
+
+    def present_worker_frame(self):
+        for kind, value in self.renderer.poll():
+            if kind == "select":
+                self.show_selection(value)
+            elif kind == "snapshot":
+                self.on_snapshot_done(*value)
+            elif kind == "recording":
+                self.on_recording_started(*value)
+        self.report_new_approaches()
+        if self.screen.get_size() != self._renderer_size:
+            self._renderer_size = self.screen.get_size()
+            self.renderer.resize(self._renderer_size)
+        frame = self.renderer.take_frame()
+        if frame is not None:
+            self.screen.blit(frame, (0, 0))
+            self.renderer.release_frame(frame)
+            self.observe_frame(self.renderer.last_render_ms)
+
+    def observe_frame(self, frame_ms):
+        tier = self.governor.observe(frame_ms)
+        if tier is not None:
+            self.set_quality(tier)
+        self._frames_drawn += 1
+        if tier is not None or self._frames_drawn % QUALITY_STATUS_EVERY == 0:
+            self.quality_label.config(text=self.governor.status())
+
+    def on_quality_choice(self, choice):
+        if choice == "Auto":
+            self.governor.pin(None)
+        else:
+            self.set_quality(self.governor.pin(choice))
+        self.quality_label.config(text=self.governor.status())
+
+    def report_new_approaches(self):
+        total = self.approach_count
+        if total != self._approaches_seen and self.approach_events:
+            self._approaches_seen = total
+            day, a, b, dist = self.approach_events[-1]
+            self.status.config(text=f"☄️ {b} passed {dist} AU from {a} on day {day:,.0f}")
+
+    def on_render_input(self, event):
+        # Runs on the render worker thread between frames; Tk calls are left to the UI thread
+        # via the reply.
+        if event[0] == "input":
+            name = self.apply_input(event[1], *event[2])
+            return ("select", name) if event[1] == "click" and name is not None else None
+        elif event[0] == "resize":
+            self.record("resize", *event[1])  # already applied by the worker
+        elif event[0] == "record":
+            return ("recording", self.begin_recording(event[1]))
+        elif event[0] in ("save", "load"):
+            return ("snapshot", self.run_snapshot_op(event[0], event[1]))
+        return None
 
     def on_resize(self, event):
         if hasattr(self, 'screen') and self.pygame_initialized:
@@ -293,7 +549,21 @@ Educational tool for astronomy enthusiasts and students!
             except Exception:
                 pass
 
+    def shutdown(self):
+        """Stop the render worker and finish recording, checkpoints and the belt. Idempotent;
+        runs when the window closes and again after the event loop returns."""
+        self.stop_recording()
+        if self.renderer is not None:
+            self.renderer.stop()
+            self.renderer.join(timeout=1.0)
+        if self.checkpointer is not None:
+            print("[checkpoint] " + ", ".join(f"{k}={v}" for k, v in self.checkpointer.stats().items()))
+            self.stop_checkpoints()
+        self.disable_belt()
+
     def on_closing(self):
+        self.shutdown()
         if self.pygame_initialized:
+            self.pygame_initialized = False  # no more frames once the window is going
             pygame.quit()
         self.root.destroy()
@@ -0,0 +1,386 @@
+# events.py
+# Search the model solar system for conjunctions, oppositions, greatest elongations and
+# multi-planet alignments over a range of days, without stepping the animation.
+#
+# Bodies move on the circular orbits of simulation.PLANET_DATA, so every position is a
+# closed-form function of time: angle = 2*pi * day / orbital_period, with day 0 being the
+# simulation's reset (all bodies at angle 0, the same clock as SimulationSession.sim_days).
+# The search samples that function coarsely for every body / pair at once as NumPy arrays,
+# finds the sample intervals where an event function changes sign, and then refines all of
+# those brackets together by vectorised bisection.
+#
+#   python events.py 0 36525                 # a century, all planets, timings on stderr
+#   python events.py 0 3650 --kinds opposition alignment
+
+import argparse, math, sys, time
+
+import numpy as np
+
+DEFAULT_OBSERVER = "earth"
+ALIGNMENT_WIDTH_DEG = 30.0  # all bodies of an alignment fit in a sector this wide (seen from the Sun)
+ALIGNMENT_MIN_BODIES = 3
+MIN_ELONGATION_DEG = 5.0    # ignore stationary elongation points this close to the Sun
+SAMPLES_PER_PERIOD = 32     # coarse step = shortest orbital period involved / this
+TOLERANCE_DAYS = 1e-4       # bisection stops once every bracket is narrower than this
+KINDS = ("conjunction", "opposition", "elongation", "alignment")
+
+
+class AstroEvent:
+    """
+    kind   -- "conjunction", "opposition", "elongation" or "alignment"
+    day    -- simulation day of the event (alignment: day of the tightest grouping)
+    bodies -- body names involved; ("Sun", planet) for conjunctions with the Sun
+    angle  -- degrees: elongation from the Sun, or the alignment's sector width
+    detail -- "inferior"/"superior" conjunction, "east"/"west" elongation, or ""
+    window -- (first_day, last_day) an alignment holds for; None for instant events
+    """
+
+    __slots__ = ("kind", "day", "bodies", "angle", "detail", "window")
+
+    def __init__(self, kind, day, bodies, angle, detail="", window=None):
+        self.kind = kind
+        self.day = day
+        self.bodies = tuple(bodies)
+        self.angle = angle
+        self.detail = detail
+        self.window = window
+
+    def __repr__(self):
+        return (f"AstroEvent({self.kind!r}, day={self.day:.2f}, bodies={self.bodies}, "
+                f"angle={self.angle:.2f}, detail={self.detail!r})")
+
+    def as_row(self):
+        """(Day, Event, Bodies, Angle) for results_view.VirtualList."""
+        kind = f"{self.detail} {self.kind}".strip()
+        return (round(self.day, 2), kind, " / ".join(self.bodies), round(self.angle, 2))
+
+
+def _body_type(body):
+    return body.get_info().split("Type: ")[1].split("\n")[0]
+
+
+def default_bodies():
+    """The planets of simulation.PLANET_DATA (the Sun and the Moon do not orbit as planets here)."""
+    from simulation import PLANET_DATA
+    return [body for body in PLANET_DATA if body.orbital_period and _body_type(body) == "Planet"]
+
+
+class _Orbits:
+    """Circular orbits as arrays: radius[i], omega[i] (rad/day)."""
+
+    def __init__(self, bodies):
+        self.names = [body.name for body in bodies]
+        self.radius = np.array([float(body.orbit_distance) for body in bodies])
+        self.omega = np.array([2 * math.pi / body.orbital_period if body.orbital_period else 0.0
+                               for body in bodies])
+
+    def angle(self, t, idx):
+        """Heliocentric angle of bodies idx at each time in t, shape (len(t), len(idx))."""
+        return np.multiply.outer(t, self.omega[idx])
+
+
+def _sample_times(start, end, step):
+    count = max(2, int(math.ceil((end - start) / step)) + 1)
+    return np.linspace(start, end, count)
+
+
+def _sign_changes(values):
+    """(sample index, column) of every interval [t[i], t[i+1]] where a column changes sign."""
+    s = np.signbit(values)
+    return np.nonzero(s[1:] != s[:-1])
+
+
+def _bisect(f, lo, hi, tol=TOLERANCE_DAYS):
+    """
+    Refine many brackets at once. f(t) evaluates bracket k's function at t[k]; every
+    bracket must have a sign change. Returns one root per bracket.
+    """
+    lo, hi = lo.astype(np.float64), hi.astype(np.float64)
+    f_lo = np.signbit(f(lo))
+    for _ in range(int(math.ceil(math.log2(max(float((hi - lo).max(initial=0.0)), tol) / tol))) + 1):
+        mid = 0.5 * (lo + hi)
+        same = np.signbit(f(mid)) == f_lo
+        lo = np.where(same, mid, lo)
+        hi = np.where(same, hi, mid)
+    return 0.5 * (lo + hi)
+
+
+def _cross(ax, ay, bx, by):
+    return ax * by - ay * bx
+
+
+class EventFinder:
+    """
+    bodies   -- CelestialBody list to search (default: the planets of PLANET_DATA)
+    observer -- name of the body events are seen from (oppositions, elongations, conjunctions)
+    step     -- coarse sampling step in days (default: shortest period / SAMPLES_PER_PERIOD)
+    """
+
+    def __init__(self, bodies=None, observer=DEFAULT_OBSERVER, step=None):
+        from simulation import SOLAR_SYSTEM
+        bodies = default_bodies() if bodies is None else list(bodies)
+        observer_body = SOLAR_SYSTEM[observer.lower()]
+        if observer_body not in bodies:
+            bodies.append(observer_body)
+        self.orbits = _Orbits(bodies)
+        self.observer = bodies.index(observer_body)
+        self.targets = np.array([i for i in range(len(bodies)) if i != self.observer])
+        periods = [b.orbital_period for b in bodies if b.orbital_period]
+        self.step = float(step) if step else min(periods) / SAMPLES_PER_PERIOD
+
+    # ---------- searches ----------
+    def sun_events(self, start, end):
+        """Conjunctions with the Sun and oppositions: roots of sin(elongation)."""
+        idx = self.targets
+        t = _sample_times(start, end, self.step)
+        f = np.sin(self._elongation_at(t[:, None], idx[None, :]))
+        i, col = _sign_changes(f)
+        if not len(i):
+            return []
+        body = idx[col]
+        roots = _bisect(lambda tr: np.sin(self._elongation_at(tr, body)), t[i], t[i + 1])
+        e = self._elongation_at(roots, body)
+        dist = self._distance_at(roots, body)
+        sun_dist = self.orbits.radius[self.observer]
+        events = []
+        for day, b, el, d in zip(roots.tolist(), body.tolist(), e.tolist(), dist.tolist()):
+            name = self.orbits.names[b]
+            if math.cos(el) > 0:
+                inner = self.orbits.radius[b] < sun_dist
+                detail = ("inferior" if d < sun_dist else "superior") if inner else ""
+                events.append(AstroEvent("conjunction", day, ("Sun", name), abs(math.degrees(el)), detail))
+            else:
+                events.append(AstroEvent("opposition", day, (name,), 180.0 - abs(math.degrees(el))))
+        return events
+
+    def elongation_events(self, start, end):
+        """Greatest elongations of bodies inside the observer's orbit: roots of d(elongation)/dt."""
+        inner = self.targets[self.orbits.radius[self.targets] < self.orbits.radius[self.observer]]
+        if not len(inner):
+            return []
+        t = _sample_times(start, end, self.step)
+        i, col = _sign_changes(self._elongation_rate(t[:, None], inner[None, :]))
+        if not len(i):
+            return []
+        body = inner[col]
+        roots = _bisect(lambda tr: self._elongation_rate(tr, body), t[i], t[i + 1])
+        e = np.degrees(self._elongation_at(roots, body))
+        keep = np.abs(e) >= MIN_ELONGATION_DEG
+        return [AstroEvent("elongation", day, (self.orbits.names[b],), abs(el), "east" if el > 0 else "west")
+                for day, b, el in zip(roots[keep].tolist(), body[keep].tolist(), e[keep].tolist())]
+
+    def pair_conjunctions(self, start, end):
+        """Two bodies at the same longitude as seen by the observer, for all pairs at once."""
+        idx = self.targets
+        a, b = np.triu_indices(len(idx), k=1)
+        a, b = idx[a], idx[b]
+        if not len(a):
+            return []
+        t = _sample_times(start, end, self.step)
+        ux, uy = self._vector_at(t[:, None], idx[None, :])
+        col_of = {body: c for c, body in enumerate(idx.tolist())}
+        ca = np.array([col_of[x] for x in a.tolist()])
+        cb = np.array([col_of[x] for x in b.tolist()])
+        i, pair = _sign_changes(_cross(ux[:, ca], uy[:, ca], ux[:, cb], uy[:, cb]))
+        if not len(i):
+            return []
+        pa, pb = a[pair], b[pair]
+
+        def separation(tr):
+            ax, ay = self._vector_at(tr, pa)
+            bx, by = self._vector_at(tr, pb)
+            return np.arctan2(_cross(ax, ay, bx, by), ax * bx + ay * by)
+
+        roots = _bisect(lambda tr: np.sin(separation(tr)), t[i], t[i + 1])
+        sep = separation(roots)
+        keep = np.cos(sep) > 0  # sin also vanishes when the two are on opposite sides of the sky
+        e = np.degrees(self._elongation_at(roots, pa))
+        return [AstroEvent("conjunction", day, (self.orbits.names[x], self.orbits.names[y]), abs(el))
+                for day, x, y, el in zip(roots[keep].tolist(), pa[keep].tolist(), pb[keep].tolist(),
+                                         e[keep].tolist())]
+
+    def alignments(self, start, end, width_deg=ALIGNMENT_WIDTH_DEG, min_bodies=ALIGNMENT_MIN_BODIES):
+        """
+        Spans of time during which at least min_bodies planets (the observer included) lie in
+        one sector of width_deg degrees as seen from the Sun. One event per span, at the day
+        the tightest such group is narrowest. Spans and breaks shorter than the coarse step
+        are found too: see the extra samples below.
+        """
+        idx = np.array([i for i in range(len(self.orbits.names)) if self.orbits.radius[i] > 0])
+        k = int(min_bodies)
+        if k < 2 or k > len(idx):
+            return []
+        width = math.radians(width_deg)
+        t = _sample_times(start, end, self.step)
+
+        def narrowest(tr):
+            return self._tightest_group(tr, idx, k)[0]
+
+        def excess(tr):
+            return narrowest(tr) - width
+
+        span = narrowest(t)
+        inside = span <= width
+
+        # A span shorter than the step can fall between two samples outside the sector, and a
+        # brief break between two inside it. The group's width changes no faster than the spread
+        # of the bodies' angular speeds, so only intervals whose ends are within that much of the
+        # threshold can hide either; their extreme is found and added as an extra sample.
+        slack = 0.5 * float(np.ptp(self.orbits.omega[idx])) * np.diff(t)
+        mean = 0.5 * (span[:-1] + span[1:])
+        dips = np.flatnonzero(~inside[:-1] & ~inside[1:] & (mean - slack <= width))
+        bumps = np.flatnonzero(inside[:-1] & inside[1:] & (mean + slack > width))
+        if len(dips) or len(bumps):
+            extra = np.r_[self._golden_min(narrowest, t[dips], t[dips + 1]),
+                          self._golden_min(lambda tr: -narrowest(tr), t[bumps], t[bumps + 1])]
+            at = np.r_[dips, bumps] + 1
+            t = np.insert(t, at, extra)
+            span = np.insert(span, at, narrowest(extra))
+            inside = span <= width
+        if not inside.any():
+            return []
+
+        # Runs of samples inside the sector, and their refined first and last days.
+        edges = np.diff(inside.astype(np.int8))
+        run_start = np.flatnonzero(edges == 1) + 1
+        run_end = np.flatnonzero(edges == -1)
+        if inside[0]:
+            run_start = np.r_[0, run_start]
+        if inside[-1]:
+            run_end = np.r_[run_end, len(t) - 1]
+
+        first = t[run_start].copy()
+        opened = run_start > 0
+        if opened.any():
+            first[opened] = _bisect(excess, t[run_start[opened] - 1], t[run_start[opened]])
+        last = t[run_end].copy()
+        closed = run_end < len(t) - 1
+        if closed.any():
+            last[closed] = _bisect(excess, t[run_end[closed]], t[run_end[closed] + 1])
+
+        peak = np.array([s + int(np.argmin(span[s:e + 1])) for s, e in zip(run_start, run_end)])
+        day = self._golden_min(narrowest, np.maximum(t[peak] - self.step, first),
+                               np.minimum(t[peak] + self.step, last))
+        best, members = self._tightest_group(day, idx, k, width)
+        return [AstroEvent("alignment", d, [self.orbits.names[m] for m in group], math.degrees(s),
+                           window=(f, l))
+                for d, s, group, f, l in zip(day.tolist(), best.tolist(), members, first.tolist(), last.tolist())]
+
+    def find(self, start, end, kinds=KINDS, **alignment):
+        """All requested event kinds between days start and end, sorted by day."""
+        kinds = set(kinds)
+        unknown = kinds - set(KINDS)
+        if unknown:
+            raise ValueError(f"Unknown event kind(s): {', '.join(sorted(unknown))}")
+        if end < start:
+            raise ValueError("end must not be before start")
+        events = []
+        if kinds & {"conjunction", "opposition"}:
+            events += [e for e in self.sun_events(start, end) if e.kind in kinds]
+        if "conjunction" in kinds:
+            events += self.pair_conjunctions(start, end)
+        if "elongation" in kinds:
+            events += self.elongation_events(start, end)
+        if "alignment" in kinds:
+            events += self.alignments(start, end, **alignment)
+        events.sort(key=lambda e: e.day)
+        return events
+
+    # ---------- per-bracket evaluation (t and body index arrays of the same shape) ----------
+    def _vector_at(self, t, body):
+        a = t * self.orbits.omega[body]
+        o = t * self.orbits.omega[self.observer]
+        r, ro = self.orbits.radius[body], self.orbits.radius[self.observer]
+        return r * np.cos(a) - ro * np.cos(o), r * np.sin(a) - ro * np.sin(o)
+
+    def _elongation_at(self, t, body):
+        dx, dy = self._vector_at(t, body)
+        o = t * self.orbits.omega[self.observer]
+        sx, sy = -np.cos(o), -np.sin(o)
+        return np.arctan2(_cross(sx, sy, dx, dy), sx * dx + sy * dy)
+
+    def _distance_at(self, t, body):
+        return np.hypot(*self._vector_at(t, body))
+
+    def _elongation_rate(self, t, body):
+        """d/dt of the elongation: rate of the body's apparent longitude minus the Sun's."""
+        t, body = np.broadcast_arrays(t, body)
+        dx, dy = self._vector_at(t, body)
+        r, w = self.orbits.radius, self.orbits.omega
+        a, o = t * w[body], t * w[self.observer]
+        vx = -r[body] * w[body] * np.sin(a) + r[self.observer] * w[self.observer] * np.sin(o)
+        vy = r[body] * w[body] * np.cos(a) - r[self.observer] * w[self.observer] * np.cos(o)
+        return _cross(dx, dy, vx, vy) / (dx * dx + dy * dy) - w[self.observer]
+
+    def _tightest_group(self, t, idx, k, width=None):
+        """
+        Narrowest sector (rad, seen from the Sun) holding k of the bodies idx, per time in t.
+        With width (rad), also returns the bodies inside a sector of that width centred on it.
+        """
+        lon = np.remainder(self.orbits.angle(np.asarray(t, dtype=np.float64), idx), 2 * math.pi)
+        order = np.argsort(lon, axis=1)
+        lon = np.take_along_axis(lon, order, axis=1)
+        wrapped = np.concatenate([lon, lon + 2 * math.pi], axis=1)
+        n = len(idx)
+        spans = wrapped[:, k - 1:k - 1 + n] - wrapped[:, :n]
+        first = np.argmin(spans, axis=1)
+        span = spans[np.arange(len(lon)), first]
+        if width is None:
+            return span, first
+        members = []
+        for row, (f, s) in enumerate(zip(first.tolist(), span.tolist())):
+            centre = wrapped[row, f] + s / 2
+            off = np.abs(np.remainder(lon[row] - centre + math.pi, 2 * math.pi) - math.pi)
+            inside = order[row][off <= width / 2 + 1e-12]
+            members.append(sorted(idx[inside].tolist()))
+        return span, members
+
+    @staticmethod
+    def _golden_min(f, lo, hi, tol=TOLERANCE_DAYS):
+        """Vectorised golden-section search for the minimum of f on each [lo, hi]."""
+        g = (math.sqrt(5) - 1) / 2
+        lo, hi = lo.astype(np.float64), hi.astype(np.float64)
+        c, d = hi - g * (hi - lo), lo + g * (hi - lo)
+        fc, fd = f(c), f(d)
+        while len(lo) and float((hi - lo).max()) > tol:
+            left = fc < fd
+            hi = np.where(left, d, hi)
+            lo = np.where(left, lo, c)
+            c, d = np.where(left, hi - g * (hi - lo), d), np.where(left, c, lo + g * (hi - lo))
+            fc, fd = np.where(left, f(c), fd), np.where(left, fc, f(d))
+        return 0.5 * (lo + hi)
+
+
+def find_events(start, end, kinds=KINDS, bodies=None, observer=DEFAULT_OBSERVER, step=None, **alignment):
+    """Convenience wrapper: EventFinder(bodies, observer, step).find(start, end, kinds, ...)."""
+    return EventFinder(bodies, observer, step).find(start, end, kinds, **alignment)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="List conjunctions, oppositions, elongations and alignments.")
+    ap.add_argument("start", type=float, help="first simulation day")
+    ap.add_argument("end", type=float, help="last simulation day")
+    ap.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    ap.add_argument("--observer", default=DEFAULT_OBSERVER)
+    ap.add_argument("--step", type=float, help="coarse sampling step in days")
+    ap.add_argument("--width", type=float, default=ALIGNMENT_WIDTH_DEG, help="alignment sector, degrees")
+    ap.add_argument("--min-bodies", type=int, default=ALIGNMENT_MIN_BODIES)
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    try:
+        events = find_events(args.start, args.end, args.kinds, observer=args.observer, step=args.step,
+                             width_deg=args.width, min_bodies=args.min_bodies)
+    except (KeyError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - t0
+    for e in events:
+        day, kind, bodies, angle = e.as_row()
+        print(f"{day:12.2f}  {kind:22}  {bodies:32}  {angle:7.2f}")
+    print(f"{len(events)} events over {args.end - args.start:,.0f} days in {elapsed:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
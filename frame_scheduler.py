@@ -0,0 +1,172 @@
+# frame_scheduler.py
+# One asyncio loop that drives Tk event processing, pygame frames and background jobs.
+# Replaces root.mainloop() + root.after(30, ...) so frame pacing no longer depends on Tk load
+# and long jobs (ingest, search, ephemeris generation) run off the UI thread.
+
+import asyncio, itertools, time
+from concurrent.futures import ThreadPoolExecutor
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+
+class FrameScheduler:
+    """
+    Runs Tk, a per-frame callback and a bounded priority work queue on one asyncio loop.
+
+    Frames are paced against absolute deadlines. When a frame overruns, the missed slots are
+    skipped (never queued up), and the effective frame rate adapts down to what the frame
+    actually costs, recovering towards target_fps once frames get cheap again.
+    Work items run in a thread pool; their on_done callbacks run back on the UI thread.
+    """
+
+    def __init__(self, root, target_fps=33, min_fps=10, tk_interval=0.005,
+                 queue_size=64, workers=2):
+        self.root = root
+        self.target_fps = target_fps
+        self.min_fps = min_fps
+        self.tk_interval = tk_interval
+        self.queue_size = queue_size
+        self.workers = workers
+        self.frame_callback = None
+
+        self.frame_interval = 1.0 / target_fps
+        self._frame_cost = 0.0  # exponential moving average, seconds
+        self._seq = itertools.count()
+        self._queue = None
+        self._pending = []  # work submitted before the loop started
+        self._executor = None
+        self._running = False
+
+        self.frames = 0
+        self.skipped_frames = 0
+        self.missed_deadlines = 0
+        self.jobs_done = 0
+        self.jobs_rejected = 0
+        self.job_errors = 0
+
+    # ---------- public API ----------
+    def set_frame_callback(self, fn):
+        self.frame_callback = fn
+
+    def submit(self, fn, *args, priority=PRIORITY_NORMAL, on_done=None):
+        """
+        Queue fn(*args) for a worker thread. Returns False if the queue is full.
+        Call from the loop thread only (Tk callbacks run there); the asyncio queue is not
+        thread-safe.
+        """
+        item = (priority, next(self._seq), fn, args, on_done)
+        if self._queue is None:
+            if len(self._pending) >= self.queue_size:
+                self.jobs_rejected += 1
+                return False
+            self._pending.append(item)
+            return True
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            self.jobs_rejected += 1
+            return False
+
+    def stats(self):
+        return {
+            "fps_target": self.target_fps,
+            "fps_effective": round(1.0 / self.frame_interval, 1),
+            "frame_cost_ms": round(self._frame_cost * 1000, 2),
+            "frames": self.frames,
+            "skipped_frames": self.skipped_frames,
+            "missed_deadlines": self.missed_deadlines,
+            "jobs_done": self.jobs_done,
+            "jobs_rejected": self.jobs_rejected,
+            "job_errors": self.job_errors,
+            "queue_depth": self._queue.qsize() if self._queue else len(self._pending),
+        }
+
+    def run(self):
+        """Blocking replacement for root.mainloop(); returns when the Tk root is destroyed."""
+        asyncio.run(self._main())
+
+    def stop(self):
+        self._running = False
+
+    # ---------- loop internals ----------
+    async def _main(self):
+        self._running = True
+        self._queue = asyncio.PriorityQueue(self.queue_size)
+        for item in self._pending:
+            self._queue.put_nowait(item)
+        self._pending.clear()
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="frame-job")
+        tasks = [asyncio.create_task(self._frame_loop())]
+        tasks += [asyncio.create_task(self._job_worker()) for _ in range(self.workers)]
+        try:
+            await self._tk_loop()
+        finally:
+            self._running = False
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _tk_loop(self):
+        import tkinter as tk
+        while self._running:
+            try:
+                self.root.update()
+            except tk.TclError:  # root destroyed -> window closed
+                break
+            await asyncio.sleep(self.tk_interval)
+
+    async def _frame_loop(self):
+        next_deadline = time.perf_counter()
+        while self._running:
+            delay = next_deadline - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            start = time.perf_counter()
+            if self.frame_callback is not None:
+                try:
+                    self.frame_callback()
+                except Exception as e:
+                    print(f"Frame callback error: {e}")
+            end = time.perf_counter()
+            self.frames += 1
+            self._adapt(end - start)
+
+            next_deadline += self.frame_interval
+            if end > next_deadline:
+                # Overran into the next slot(s): drop them instead of letting latency build up.
+                self.missed_deadlines += 1
+                behind = int((end - next_deadline) / self.frame_interval) + 1
+                self.skipped_frames += behind
+                next_deadline += behind * self.frame_interval
+            else:
+                await asyncio.sleep(0)  # let Tk and job callbacks in between frames
+
+    def _adapt(self, cost):
+        self._frame_cost = cost if self.frames == 1 else 0.9 * self._frame_cost + 0.1 * cost
+        target = 1.0 / self.target_fps
+        slowest = 1.0 / self.min_fps
+        # Leave ~25% headroom for Tk and job callbacks sharing the loop.
+        wanted = min(max(target, self._frame_cost * 1.25), slowest)
+        self.frame_interval += (wanted - self.frame_interval) * 0.2
+
+    async def _job_worker(self):
+        loop = asyncio.get_running_loop()
+        while self._running:
+            priority, _, fn, args, on_done = await self._queue.get()
+            try:
+                result = await loop.run_in_executor(self._executor, fn, *args)
+                self.jobs_done += 1
+                if on_done is not None:
+                    on_done(result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.job_errors += 1
+                print(f"Background job error: {e}")
+            finally:
+                self._queue.task_done()
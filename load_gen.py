@@ -0,0 +1,140 @@
+# load_gen.py
+# Load generator for query_server.py: keep-alive HTTP clients on asyncio, reporting
+# requests/second and latency percentiles.
+#
+#   python load_gen.py --spawn                       # start a server, measure, stop it
+#   python load_gen.py --url http://127.0.0.1:8765 --concurrency 64 --duration 10
+#   python load_gen.py --spawn --distinct 1000000    # mostly cache misses
+#
+# --distinct is how many different days position requests are drawn from, so it sets the
+# cache hit rate; --mix picks the request kinds.
+
+import argparse, asyncio, os, random, socket, subprocess, sys, time
+from urllib.parse import quote, urlsplit
+
+MIX = ("lookup", "position", "query", "bulk")
+NAMES = ("sun", "mercury", "venus", "earth", "moon", "mars", "jupiter", "saturn")
+
+
+def make_request(kind, rng, distinct):
+    """(method, path, body) for one request of the given kind."""
+    if kind == "lookup":
+        return "GET", f"/lookup?name={rng.choice(NAMES)}", b""
+    if kind == "position":
+        return "GET", f"/position?name={rng.choice(NAMES)}&day={rng.randrange(distinct)}", b""
+    if kind == "query":
+        where = quote('{"type":"Planet","moons":{"gte":%d}}' % rng.randint(0, 3))
+        return "GET", f"/query?where={where}&fields=name,moons", b""
+    body = ",".join('{"name":"%s","day":%d}' % (rng.choice(NAMES), rng.randrange(distinct)) for _ in range(100))
+    return "POST", "/positions", f'{{"requests":[{body}]}}'.encode()
+
+
+async def _client(host, port, kinds, distinct, deadline, latencies, errors, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            method, path, body = make_request(rng.choice(kinds), rng, distinct)
+            head = f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n\r\n"
+            t0 = time.perf_counter()
+            writer.write(head.encode() + body)
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+            if b" 200 " not in status:
+                errors.append(status.decode().strip())
+    finally:
+        writer.close()
+
+
+async def run_load(url, concurrency, duration, kinds, distinct):
+    parts = urlsplit(url)
+    deadline = time.perf_counter() + duration
+    latencies, errors = [], []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_client(parts.hostname, parts.port or 80, kinds, distinct, deadline,
+                                   latencies, errors, seed) for seed in range(concurrency)))
+    return latencies, errors, time.perf_counter() - t0
+
+
+async def fetch_metrics(url):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    writer.write(f"GET /metrics HTTP/1.1\r\nHost: {parts.hostname}\r\nConnection: close\r\n\r\n".encode())
+    data = await reader.read()
+    writer.close()
+    return data.decode().split("\r\n\r\n", 1)[-1]
+
+
+def _wait_for_server(url, proc, timeout=10.0):
+    parts = urlsplit(url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("query_server.py exited during startup")
+        try:
+            socket.create_connection((parts.hostname, parts.port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server at {url} did not come up")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Measure query_server.py requests/second.")
+    ap.add_argument("--url", default="http://127.0.0.1:8765")
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--duration", type=float, default=5.0, help="seconds")
+    ap.add_argument("--mix", default="lookup,position,query", help=f"comma list of {', '.join(MIX)}")
+    ap.add_argument("--distinct", type=int, default=365, help="distinct days used by position requests")
+    ap.add_argument("--spawn", action="store_true", help="start query_server.py for the run")
+    args = ap.parse_args(argv)
+
+    kinds = args.mix.split(",")
+    unknown = set(kinds) - set(MIX)
+    if unknown:
+        ap.error(f"unknown request kind(s): {', '.join(sorted(unknown))}")
+
+    proc = None
+    if args.spawn:
+        port = urlsplit(args.url).port or 8765
+        server = os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_server.py")
+        proc = subprocess.Popen([sys.executable, server, "--port", str(port)])
+        _wait_for_server(args.url, proc)
+    try:
+        latencies, errors, wall = asyncio.run(run_load(args.url, args.concurrency, args.duration,
+                                                       kinds, args.distinct))
+        metrics = asyncio.run(fetch_metrics(args.url))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    latencies.sort()
+    n = len(latencies)
+    pct = lambda q: latencies[min(n - 1, int(q * n))] * 1000 if n else 0.0
+    print(f"requests: {n:,} in {wall:.2f} s over {args.concurrency} connections  ->  {n / wall:,.0f} req/s")
+    print(f"latency ms: p50 {pct(0.5):.2f}  p95 {pct(0.95):.2f}  p99 {pct(0.99):.2f}  max {pct(1.0):.2f}")
+    print(f"errors: {len(errors)}" + (f" (first: {errors[0]})" if errors else ""))
+    counters = dict(line.split(" ", 1) for line in metrics.splitlines()
+                    if line.startswith(("cbf_cache_hits_total", "cbf_cache_misses_total",
+                                        "cbf_position_batches_total", "cbf_position_batched_items_total")))
+    hits, misses = float(counters.get("cbf_cache_hits_total", 0)), float(counters.get("cbf_cache_misses_total", 0))
+    batches = float(counters.get("cbf_position_batches_total", 0))
+    items = float(counters.get("cbf_position_batched_items_total", 0))
+    if hits + misses:
+        print(f"server cache hit rate: {hits / (hits + misses):.1%}")
+    if batches:
+        print(f"server position batches: {batches:,.0f}, mean size {items / batches:.1f}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,14 @@
 # login_launcher.py
 # Pretty login screen that launches main.py after successful login.
 # Now with full-cover wallpaper (embedded via asset_image_background.py).
+# The main UI is imported in the background while the user types and, on success,
+# built in-process inside the login window (pass --cold to spawn main.py instead).
 
-import os, sys, hashlib, time, getpass, subprocess
+import os, sys, hashlib, time, getpass, subprocess, threading, importlib
 
 TARGET_SCRIPT = "main.py"
+TARGET_MODULE = "app_ui"
+LAUNCH_T0_ENV = "CBF_LAUNCH_T0"  # set for cold launches so main.py can report its start-up time
 
 _DEMO_USERS = {
     "admin": hashlib.sha256("1234".encode()).hexdigest(),
@@ -29,7 +33,38 @@ def _validate_credentials(username: str, password: str) -> bool:
 def _abs_path(path: str) -> str:
     return path if os.path.isabs(path) else os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
 
-def _run_target_script(path: str) -> None:
+# ---------- background pre-warm ----------
+_PREWARM = {"module": None, "error": None, "seconds": None}
+_PREWARM_DONE = threading.Event()
+
+def _prewarm_app() -> None:
+    """
+    Import the main UI module plus the catalog and simulation data it builds at import time,
+    then build what the first frames would otherwise build lazily: the ring particle systems,
+    the model-view sphere lookup table and every body's texture.
+    """
+    t0 = time.perf_counter()
+    try:
+        import data_store, simulation  # noqa: F401  (DATASET / PLANET_DATA are built on import)
+        _PREWARM["module"] = importlib.import_module(TARGET_MODULE)
+        import session, sphere_render
+        for body in simulation.PLANET_DATA:
+            if body.has_rings:
+                body.ring_system()  # seeded from the body name, so building it early changes nothing
+        sphere_render.prewarm(simulation.PLANET_DATA, session.MODEL_VIEW_SIZE)
+    except Exception as e:
+        _PREWARM["error"] = e
+    finally:
+        _PREWARM["seconds"] = time.perf_counter() - t0
+        _PREWARM_DONE.set()
+
+def _start_prewarm() -> None:
+    threading.Thread(target=_prewarm_app, name="prewarm", daemon=True).start()
+
+def _report_launch(kind: str, t0: float) -> None:
+    print(f"[launch] {kind}: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+def _run_target_script(path: str, login_at: float = None) -> None:
     path = _abs_path(path)
     if not os.path.exists(path):
         if TK_AVAILABLE and messagebox:
@@ -41,7 +76,8 @@ def _run_target_script(path: str) -> None:
         creationflags = 0
         if sys.platform.startswith("win"):
             creationflags = getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
-        subprocess.Popen([sys.executable, path], creationflags=creationflags)
+        env = dict(os.environ, **{LAUNCH_T0_ENV: repr(login_at or time.time())})
+        subprocess.Popen([sys.executable, path], creationflags=creationflags, env=env)
     except Exception as e:
         if TK_AVAILABLE and messagebox:
             messagebox.showerror("Launch error", f"Failed to start target script:\n{e}")
@@ -75,6 +111,12 @@ if TK_AVAILABLE:
             self.configure(bg="#0b0f1a")
             self._particles = []
             self._bg_image_tk = None  # keep reference
+            self._anim_id = None
+            self.app = None        # AstronomyApp after a warm handoff
+            self.scheduler = None  # its frame_scheduler.FrameScheduler
+            self._cold_launch = "--cold" in sys.argv[1:]
+            if not self._cold_launch:
+                _start_prewarm()
 
             # --- styles ---
             self._build_style()
@@ -147,7 +189,7 @@ if TK_AVAILABLE:
                 w = self.canvas.winfo_width()
                 if x1 > w:
                     self.canvas.move(item, -(w + 5), 0)
-            self.after(30, self._animate_background)
+            self._anim_id = self.after(30, self._animate_background)
 
         def _build_card(self):
             self.card = tk.Frame(self.canvas, bg="#0b0f1a")
@@ -216,6 +258,11 @@ if TK_AVAILABLE:
             t.after(1600, t.destroy)
 
         def _show_success_and_launch(self):
+            t0, login_at = time.perf_counter(), time.time()
+            if not self._cold_launch and _PREWARM_DONE.is_set() and _PREWARM["module"] is not None:
+                self._handoff(t0); return
+            if self._anim_id is not None:
+                self.after_cancel(self._anim_id); self._anim_id = None
             for w in (self.canvas, self.card): w.destroy()
             wrap = tk.Frame(self, bg="#0b0f1a"); wrap.pack(fill="both", expand=True)
             tk.Label(wrap, text="Welcome ✨", font=("Poppins", 24, "bold"),
@@ -224,11 +271,42 @@ if TK_AVAILABLE:
                      bg="#0b0f1a", fg="#c7d2fe").pack(pady=(0, 20))
             pb = ttk.Progressbar(wrap, mode="indeterminate", length=320, style="bar.Horizontal.TProgressbar")
             pb.pack(pady=10); pb.start(12)
-            self.after(900, lambda: _run_target_script(TARGET_SCRIPT))
+            if self._cold_launch:
+                self.after(900, lambda: _run_target_script(TARGET_SCRIPT, login_at))
+            else:
+                self._wait_for_prewarm(t0, login_at)
+
+        def _wait_for_prewarm(self, t0: float, login_at: float):
+            # Login beat the background import: poll until it lands, then hand over.
+            if not _PREWARM_DONE.is_set():
+                self.after(20, lambda: self._wait_for_prewarm(t0, login_at)); return
+            if _PREWARM["module"] is None:
+                print(f"[WARN] Pre-warm failed ({_PREWARM['error']}); starting {TARGET_SCRIPT} instead.",
+                      file=sys.stderr)
+                _run_target_script(TARGET_SCRIPT, login_at); return
+            self._handoff(t0)
+
+        def _handoff(self, t0: float):
+            """Swap the login contents for the main UI inside this same Tk root."""
+            if self._anim_id is not None:
+                self.after_cancel(self._anim_id); self._anim_id = None
+            self.unbind("<Return>")
+            for w in self.winfo_children(): w.destroy()
+            self.minsize(1, 1)
+            from frame_scheduler import FrameScheduler
+            self.scheduler = FrameScheduler(self, target_fps=33)  # same pacing as main.py
+            self.app = _PREWARM["module"].AstronomyApp(self, scheduler=self.scheduler)
+            print(f"[launch] pre-warm import: {_PREWARM['seconds'] * 1000:.1f} ms (in background)")
+            self.after_idle(lambda: _report_launch("warm in-process handoff", t0))
+            self.quit()  # leave mainloop(); __main__ carries on with scheduler.run()
 
 if __name__ == "__main__":
     if TK_AVAILABLE:
         app = ColorfulLogin()  # type: ignore
         app.mainloop()
+        if app.scheduler is not None:
+            app.scheduler.run()
+            app.app.shutdown()
+            print("[scheduler] " + ", ".join(f"{k}={v}" for k, v in app.scheduler.stats().items()))
     else:
         console_login()
@@ -2,10 +2,36 @@
 # main.py
 # Entry point that launches the Celestial Explorer UI (no login).
 # Keeps the same runtime output as your original app.
+import argparse, os, time
 import tkinter as tk
 from app_ui import AstronomyApp
+from frame_scheduler import FrameScheduler
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", metavar="LOG", help="record this session's input for session_replay.py")
+    parser.add_argument("--belt", type=int, default=0, metavar="N",
+                        help="add an asteroid belt of N particles (sharded across cores when large)")
+    parser.add_argument("--restore", metavar="SNAPSHOT",
+                        help="start from a snapshot file, or the newest checkpoint in a directory")
+    parser.add_argument("--checkpoint", metavar="DIR", help="write periodic checkpoints of the run into DIR")
+    parser.add_argument("--checkpoint-every", type=int, default=0, metavar="FRAMES")
+    args = parser.parse_args()
+
     root = tk.Tk()
-    app = AstronomyApp(root)
-    root.mainloop()
+    scheduler = FrameScheduler(root, target_fps=33)
+    app = AstronomyApp(root, scheduler=scheduler)
+    launch_t0 = os.environ.pop("CBF_LAUNCH_T0", None)  # set by login_launcher for cold launches
+    if launch_t0:
+        root.after_idle(lambda: print(f"[launch] cold start: {(time.time() - float(launch_t0)) * 1000:.1f} ms"))
+    if args.belt > 0:
+        app.enable_belt(args.belt)
+    if args.record and app.pygame_initialized:
+        app.start_recording(args.record)
+    if args.restore:
+        app.load_snapshot(args.restore)  # after recording starts, so the log replays it too
+    if args.checkpoint:
+        app.start_checkpoints(args.checkpoint, args.checkpoint_every or None)
+    scheduler.run()
+    app.shutdown()
+    print("[scheduler] " + ", ".join(f"{k}={v}" for k, v in scheduler.stats().items()))
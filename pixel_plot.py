@@ -0,0 +1,53 @@
+# pixel_plot.py
+# Plot large point sets by scattering straight into a Surface's pixel memory.
+# One vectorised index assignment replaces hundreds of thousands of pygame.draw calls.
+#
+# Points are turned into flat offsets into the 32-bit pixel buffer. Rejected points (off
+# the surface, or excluded by a mask) are not compressed out, which is slow for random
+# masks. Their offset is zeroed instead, so they all land on pixel (0, 0), which is saved
+# and restored around the scatter. Column x == 0 is never plotted so that this stays exact.
+
+import numpy as np
+
+
+def _scatter(surface, xs, ys, values, where=None):
+    import pygame
+    w, h = surface.get_size()
+    ix = xs.astype(np.int32)
+    iy = ys.astype(np.int32)
+    keep = (ix >= 1) & (ix < w) & (iy >= 0) & (iy < h)
+    if where is not None:
+        keep &= where
+
+    if surface.get_bytesize() != 4:
+        pixels = pygame.surfarray.pixels2d(surface)
+        try:
+            pixels[ix[keep], iy[keep]] = values if np.isscalar(values) else values[keep]
+        finally:
+            del pixels
+        return
+
+    flat = iy * (surface.get_pitch() // 4)
+    flat += ix
+    flat *= keep
+    buf = np.frombuffer(surface.get_buffer(), dtype=np.uint32)  # locks the surface until released
+    try:
+        saved = buf[0]
+        buf[flat] = values
+        buf[0] = saved
+    finally:
+        del buf
+
+
+def plot_points(surface, xs, ys, color, where=None):
+    """Set the pixel under each (xs[i], ys[i]) to color; points off the surface are dropped."""
+    _scatter(surface, xs, ys, surface.map_rgb(color), where)
+
+
+def plot_indexed(surface, xs, ys, palette_index, palette, where=None):
+    """
+    Like plot_points, with a per-point colour taken from palette[palette_index[i]].
+    where is an optional boolean mask of the points to plot.
+    """
+    packed = np.array([surface.map_rgb(c) for c in palette], dtype=np.uint32)
+    _scatter(surface, xs, ys, np.take(packed, palette_index), where)
@@ -0,0 +1,142 @@
+# quality.py
+# Render-quality tiers and the governor that moves between them to hold a frame budget.
+#
+# The governor is fed the time each simulation frame took to draw. When the recent frames
+# are over budget it steps one tier down; when they have been comfortably under budget for
+# a while it steps one tier up. Three things keep it from oscillating:
+#   - separate thresholds: down above the budget, up only below UP_HEADROOM of it
+#   - a hold after every change, so decisions are made on frames drawn at the new tier
+#   - back-off: if a tier it just moved up to proves too slow, the wait before trying that
+#     tier again doubles (up to MAX_UP_HOLD frames)
+# A pinned tier switches the governor off until it is unpinned.
+
+from collections import deque
+
+
+class QualityTier:
+    """
+    stars          -- background stars drawn per frame
+    labels         -- draw body names
+    orbit_segments -- 0: exact orbit circles; N: N-sided polygons; None: no orbit lines
+    ring_scale     -- RingSystem.detail: scales the ring's own density setting
+    trail_length   -- positions kept per body for its trail (0: no trails)
+    """
+
+    def __init__(self, name, stars, labels, orbit_segments, ring_scale, trail_length):
+        self.name = name
+        self.stars = stars
+        self.labels = labels
+        self.orbit_segments = orbit_segments
+        self.ring_scale = ring_scale
+        self.trail_length = trail_length
+
+    def __repr__(self):
+        return f"QualityTier({self.name!r})"
+
+
+# Best first. "High" is the look the simulation always had, so it is the default and what
+# headless replays use unless a log says otherwise.
+TIERS = [
+    QualityTier("Ultra", 120, True, 0, 1.0, 90),
+    QualityTier("High", 50, True, 0, 1.0, 0),
+    QualityTier("Medium", 30, True, 64, 0.4, 0),
+    QualityTier("Low", 15, False, 32, 0.15, 0),
+    QualityTier("Minimal", 0, False, None, 0.0, 0),
+]
+DEFAULT_TIER = "High"
+
+WINDOW = 30          # frames the load estimate is taken over
+LOAD_PERCENTILE = 0.8
+UP_HEADROOM = 0.6    # step up only when the load is below this fraction of the budget
+HOLD_FRAMES = 30     # frames to wait after any change before judging again
+UP_HOLD = 90         # frames of headroom needed before stepping up
+MAX_UP_HOLD = 1440
+
+
+def tier_by_name(name):
+    for tier in TIERS:
+        if tier.name.lower() == str(name).lower():
+            return tier
+    raise ValueError(f"Unknown quality tier {name!r}; expected one of {', '.join(t.name for t in TIERS)}")
+
+
+class QualityGovernor:
+    """
+    budget_ms -- frame budget (1000 / target fps)
+    tier      -- starting tier name
+
+    Call observe(frame_ms) once per drawn frame; it returns the new QualityTier when the
+    tier changes and None otherwise.
+    """
+
+    def __init__(self, budget_ms=30.0, tier=DEFAULT_TIER, window=WINDOW):
+        self.budget_ms = float(budget_ms)
+        self.index = TIERS.index(tier_by_name(tier))
+        self.pinned = False
+        self.samples = deque(maxlen=window)
+        self.changes = 0
+        self._since_change = 0
+        self._headroom_frames = 0
+        self._up_hold = [UP_HOLD] * len(TIERS)
+        self._raised_into = None  # tier index we last stepped up into, until it proves itself
+
+    @property
+    def tier(self):
+        return TIERS[self.index]
+
+    def pin(self, name=None):
+        """Hold a tier (returns it), or with None hand control back to the governor."""
+        if name is None:
+            self.pinned = False
+            self._reset_window()
+            return self.tier
+        self.pinned = True
+        self.index = TIERS.index(tier_by_name(name))
+        return self.tier
+
+    def load_ms(self):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(LOAD_PERCENTILE * len(ordered)))]
+
+    def observe(self, frame_ms):
+        self.samples.append(frame_ms)
+        self._since_change += 1
+        if self.pinned or self._since_change < max(HOLD_FRAMES, self.samples.maxlen):
+            return None
+
+        load = self.load_ms()
+        if load > self.budget_ms and self.index < len(TIERS) - 1:
+            if self._raised_into == self.index:
+                # The step up did not hold; wait longer before trying this tier again.
+                self._up_hold[self.index] = min(MAX_UP_HOLD, self._up_hold[self.index] * 2)
+            return self._change(self.index + 1)
+
+        if self._raised_into == self.index and self._since_change >= self._up_hold[self.index]:
+            self._raised_into = None  # survived as long as it had to wait: forget the back-off
+            self._up_hold[self.index] = UP_HOLD
+
+        if load < self.budget_ms * UP_HEADROOM and self.index > 0:
+            self._headroom_frames += 1
+            if self._headroom_frames >= self._up_hold[self.index - 1]:
+                self._raised_into = self.index - 1
+                return self._change(self.index - 1)
+        else:
+            self._headroom_frames = 0
+        return None
+
+    def _change(self, index):
+        self.index = index
+        self.changes += 1
+        self._reset_window()
+        return self.tier
+
+    def _reset_window(self):
+        self.samples.clear()
+        self._since_change = 0
+        self._headroom_frames = 0
+
+    def status(self):
+        mode = "pinned" if self.pinned else "auto"
+        return f"Quality: {self.tier.name} ({mode}) {self.load_ms():.1f}/{self.budget_ms:.0f} ms"
@@ -0,0 +1,324 @@
+# query_cli.py
+# Headless batch lookups: JSON requests in, JSON results out, one per line.
+# Works without a display and never imports Tk or pygame, so other services can pipe
+# queries through it.
+#
+#   echo '{"id": 1, "name": "mars"}' | python query_cli.py
+#   python query_cli.py requests.jsonl -o results.jsonl     # throughput on stderr
+#   python query_cli.py --generate 100000 | python query_cli.py > /dev/null
+#
+# Requests ("op" can be left out when it is clear from the keys):
+#   {"id": 1, "op": "lookup", "name": "Mars"}
+#   {"id": 2, "op": "query", "where": {"type": "Planet", "moons": {"gte": 2}}, "fields": ["name", "moons"]}
+#   {"id": 3, "op": "position", "name": "mars", "day": 687}
+#   {"id": 4, "op": "position", "day": 100}                  # every orbiting body
+# Responses: {"id": ..., "ok": true, "result": ...} or {"id": ..., "ok": false, "error": "..."}.
+#
+# Positions follow the simulation's circular orbits, centred on the Sun, in scene pixels and
+# AU. Day 0 is the simulation reset, unless --snapshot gives a snapshot.py file to start from.
+# Requests are handled one line at a time, so memory stays flat however long the input is.
+
+import argparse, json, math, random, sys, time
+
+from data_store import DATASET
+from simulation import PLANET_DATA, SOLAR_SYSTEM, PX_PER_AU
+
+OPS = ("lookup", "query", "position")
+COMPARISONS = {
+    "eq": lambda a, b: a == b,
+    "ne": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+    "in": lambda a, b: a in b,
+    "contains": lambda a, b: str(b).lower() in str(a).lower(),
+}
+REPORT_EVERY = 100_000  # requests between progress lines on stderr
+
+
+class QueryError(Exception):
+    pass
+
+
+def _key(name):
+    if not isinstance(name, str):
+        raise QueryError("name must be a string")
+    return name.strip().lower()
+
+
+def build_records():
+    """One flat, JSON-ready dict per body, merging data_store.DATASET and simulation.SOLAR_SYSTEM."""
+    records = {}
+    for key in sorted(set(DATASET) | set(SOLAR_SYSTEM)):
+        obj, body = DATASET.get(key), SOLAR_SYSTEM.get(key)
+        rec = {"name": obj.name if obj else body.name}
+        if obj is not None:
+            rec.update(type=obj.object_type, mass=obj.mass, gravity=obj.gravity, radius_km=obj.radius,
+                       description=obj.description)
+            for attr, field in (("moons", "moons"), ("has_life", "has_life"), ("planet", "orbits"),
+                                ("temperature", "temperature")):
+                if hasattr(obj, attr):
+                    rec[field] = getattr(obj, attr)
+        if body is not None:
+            rec.update(orbit_px=body.orbit_distance, orbit_au=round(body.orbit_distance / PX_PER_AU, 4),
+                       orbital_period=body.orbital_period)
+        records[key] = rec
+    return records
+
+
+def check_day(day):
+    if isinstance(day, bool) or not isinstance(day, (int, float)) or not math.isfinite(day):
+        raise QueryError("day must be a finite number")
+    return day
+
+
+def check_limit(limit):
+    if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit < 0):
+        raise QueryError("limit must be a non-negative integer")
+    return limit
+
+
+def fold_value(op, value):
+    """
+    The value a comparison actually tests against. Record strings are compared lowercased,
+    so every string operand and 'in' item is too; 'contains' lowercases its operand anyway,
+    so folding it here only lets equivalent filters share a cache key.
+    """
+    if isinstance(value, str) and op in ("eq", "ne", "gt", "gte", "lt", "lte", "contains"):
+        return value.lower()
+    if op == "in" and isinstance(value, list):
+        return [v.lower() if isinstance(v, str) else v for v in value]
+    return value
+
+
+def normalise_where(where):
+    """
+    Canonical form of a 'where' filter: keys sorted, bare values spelled {"eq": value}, and
+    values folded as the comparison folds them. Filters with the same canonical form match
+    the same rows, and querying with it gives the same answer as the original.
+    """
+    if not isinstance(where, dict):
+        return where
+    out = {}
+    for field, cond in sorted(where.items()):
+        if not isinstance(cond, dict):
+            cond = {"eq": cond}
+        out[field] = {op: fold_value(op, value) for op, value in sorted(cond.items())}
+    return out
+
+
+class Ephemeris:
+    """Closed-form positions on the simulation's circular orbits."""
+
+    def __init__(self, snapshot_path=None):
+        self.epoch = 0.0
+        self.angle0 = {body.name.lower(): 0.0 for body in PLANET_DATA}
+        self.omega = {body.name.lower(): 2 * math.pi / body.orbital_period if body.orbital_period else 0.0
+                      for body in PLANET_DATA}
+        if snapshot_path:
+            import snapshot
+            snap = snapshot.read_snapshot(snapshot_path)
+            self.epoch = snap.scalars["sim_days"]
+            for name, angle, omega in zip(snap.scalars["bodies"], snap.arrays["body.angle"].tolist(),
+                                          snap.arrays["body.omega"].tolist()):
+                self.angle0[name.lower()], self.omega[name.lower()] = angle, omega
+
+    def position(self, key, day):
+        body = SOLAR_SYSTEM[key]
+        angle = self.angle0[key] + self.omega[key] * (day - self.epoch)
+        x = body.orbit_distance * math.cos(angle)
+        y = body.orbit_distance * math.sin(angle)
+        return {"name": body.name, "day": day, "angle": math.remainder(angle, 2 * math.pi),
+                "x_px": x, "y_px": y, "x_au": x / PX_PER_AU, "y_au": y / PX_PER_AU}
+
+    def batch(self, keys, days):
+        """position() for many (key, day) pairs, with the trigonometry in one NumPy pass."""
+        import numpy as np
+        radius = np.array([SOLAR_SYSTEM[key].orbit_distance for key in keys], dtype=np.float64)
+        angle = np.array([self.angle0[key] for key in keys], dtype=np.float64)
+        angle += np.array([self.omega[key] for key in keys]) * (np.asarray(days, dtype=np.float64) - self.epoch)
+        x, y = radius * np.cos(angle), radius * np.sin(angle)
+        return [{"name": SOLAR_SYSTEM[key].name, "day": day, "angle": math.remainder(a, 2 * math.pi),
+                 "x_px": px, "y_px": py, "x_au": px / PX_PER_AU, "y_au": py / PX_PER_AU}
+                for key, day, a, px, py in zip(keys, days, angle.tolist(), x.tolist(), y.tolist())]
+
+
+class QueryEngine:
+    def __init__(self, snapshot_path=None):
+        self.records = build_records()
+        self.fields = sorted({field for rec in self.records.values() for field in rec})
+        self.ephemeris = Ephemeris(snapshot_path)
+
+    def handle(self, request):
+        if not isinstance(request, dict):
+            raise QueryError("request must be a JSON object")
+        op = request.get("op") or self._infer_op(request)
+        if op == "lookup":
+            return self.lookup(request.get("name"))
+        if op == "query":
+            return self.query(request.get("where", {}), request.get("fields"), request.get("limit"))
+        if op == "position":
+            day = request.get("day", self.ephemeris.epoch)
+            if "name" in request:
+                return self.positions([request["name"]], day)[0]
+            return self.positions(request.get("names"), day)
+        raise QueryError(f"unknown op {op!r}; expected one of {', '.join(OPS)}")
+
+    @staticmethod
+    def _infer_op(request):
+        if "day" in request:
+            return "position"
+        if "where" in request:
+            return "query"
+        if "name" in request:
+            return "lookup"
+        raise QueryError("cannot tell the op; give 'op' or one of 'name', 'where', 'day'")
+
+    def lookup(self, name):
+        rec = self.records.get(_key(name))
+        if rec is None:
+            raise QueryError(f"unknown body {name!r}")
+        return rec
+
+    def query(self, where, fields=None, limit=None):
+        if not isinstance(where, dict):
+            raise QueryError("'where' must be an object of field: value or field: {op: value}")
+        tests = [self._compile(field, cond) for field, cond in where.items()]
+        check_limit(limit)
+        if fields is not None:
+            if not isinstance(fields, list) or not all(isinstance(f, str) for f in fields):
+                raise QueryError("fields must be a list of field names")
+            unknown = set(fields) - set(self.fields)
+            if unknown:
+                raise QueryError(f"unknown field(s): {', '.join(sorted(unknown))}")
+        out = []
+        for rec in self.records.values():
+            if limit is not None and len(out) >= limit:
+                break
+            if all(test(rec) for test in tests):
+                out.append(rec if fields is None else {f: rec.get(f) for f in fields})
+        return out
+
+    def _compile(self, field, cond):
+        if field not in self.fields:
+            raise QueryError(f"unknown field {field!r}")
+        if not isinstance(cond, dict):
+            cond = {"eq": cond}
+        checks = []
+        for op, value in cond.items():
+            compare = COMPARISONS.get(op)
+            if compare is None:
+                raise QueryError(f"unknown comparison {op!r}; expected one of {', '.join(COMPARISONS)}")
+            if op == "in" and not isinstance(value, list):
+                raise QueryError("'in' takes a list")
+            checks.append((compare, fold_value(op, value)))
+
+        def test(rec):
+            if field not in rec:
+                return False
+            have = rec[field]
+            if isinstance(have, str):
+                have = have.lower()
+            try:
+                return all(compare(have, value) for compare, value in checks)
+            except TypeError:
+                return False
+        return test
+
+    def positions(self, names, day):
+        day = check_day(day)
+        return [self.ephemeris.position(key, day) for key in self.orbit_keys(names)]
+
+    @staticmethod
+    def orbit_keys(names):
+        """Normalised SOLAR_SYSTEM keys for names (None: every body); QueryError if unknown."""
+        if names is None:
+            return [body.name.lower() for body in PLANET_DATA]
+        if not isinstance(names, list):
+            raise QueryError("names must be a list")
+        keys = [_key(name) for name in names]
+        missing = [name for name, key in zip(names, keys) if key not in SOLAR_SYSTEM]
+        if missing:
+            raise QueryError(f"no orbit for {', '.join(map(repr, missing))}")
+        return keys
+
+
+def run(lines, out, engine, report=None):
+    """Answer each request line on out. Returns (requests, errors)."""
+    count = errors = 0
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+    for line in lines:
+        if not line.strip():
+            continue
+        count += 1
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id") if isinstance(request, dict) else None
+            response = {"id": request_id, "ok": True, "result": engine.handle(request)}
+        except (QueryError, ValueError) as e:  # json.JSONDecodeError is a ValueError
+            errors += 1
+            response = {"id": request_id, "ok": False, "error": str(e)}
+        out.write(dumps(response))
+        out.write("\n")
+        if report is not None and count % REPORT_EVERY == 0:
+            report(count, errors)
+    return count, errors
+
+
+def generate(n, seed=0):
+    """Synthetic request mix for throughput runs."""
+    rng = random.Random(seed)
+    names = [body.name for body in PLANET_DATA]
+    for i in range(n):
+        kind = rng.random()
+        if kind < 0.5:
+            yield {"id": i, "name": rng.choice(names)}
+        elif kind < 0.8:
+            yield {"id": i, "name": rng.choice(names), "day": round(rng.uniform(0, 36525), 2)}
+        else:
+            yield {"id": i, "where": {"type": "Planet", "moons": {"gte": rng.randint(0, 3)}},
+                   "fields": ["name", "moons"]}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Answer JSON-lines body queries without the GUI.")
+    ap.add_argument("input", nargs="?", help="request file (default: stdin)")
+    ap.add_argument("-o", "--output", help="result file (default: stdout)")
+    ap.add_argument("--snapshot", help="snapshot.py file whose state positions start from")
+    ap.add_argument("--generate", type=int, metavar="N", help="print N synthetic requests and exit")
+    ap.add_argument("--quiet", action="store_true", help="no throughput report on stderr")
+    args = ap.parse_args(argv)
+
+    if args.generate is not None:
+        for request in generate(args.generate):
+            sys.stdout.write(json.dumps(request, separators=(",", ":")) + "\n")
+        return 0
+
+    engine = QueryEngine(args.snapshot)
+    src = open(args.input, encoding="utf-8") if args.input else sys.stdin
+    dst = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    t0 = time.perf_counter()
+
+    def report(count, errors):
+        if not args.quiet:
+            dt = time.perf_counter() - t0
+            print(f"[query] {count:,} requests, {errors:,} errors, {count / dt:,.0f} q/s", file=sys.stderr)
+
+    try:
+        count, errors = run(src, dst, engine, report)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+        else:
+            dst.flush()
+    if count % REPORT_EVERY or not count:
+        report(count, errors)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
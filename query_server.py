@@ -0,0 +1,392 @@
+# query_server.py
+# Long-running local HTTP service for catalog lookups and body positions, so dashboards
+# don't each embed data_store / simulation. Pure asyncio (no web framework) on 127.0.0.1;
+# the answers come from query_cli.QueryEngine, so the CLI and the service always agree.
+#
+#   python query_server.py --port 8765
+#   curl 'http://127.0.0.1:8765/lookup?name=mars'
+#   curl 'http://127.0.0.1:8765/query?where={"type":"Planet"}&fields=name,moons&limit=3'
+#   curl 'http://127.0.0.1:8765/position?name=mars&day=687'
+#   curl -d '{"requests": [{"name": "mars", "day": 1}, {"name": "venus", "day": 2}]}' \
+#        http://127.0.0.1:8765/positions
+#   curl http://127.0.0.1:8765/metrics
+#   python load_gen.py --spawn                            # requests/second
+#
+# Responses use the CLI's envelope: {"ok": true, "result": ...} / {"ok": false, "error": ...}.
+# GET responses are cached (LRU with a TTL) under a normalised form of the query, so
+# "name=Mars" and "name= mars" share an entry; queries are answered from that same
+# normalised form (query_cli.normalise_where), so an entry can't serve a different
+# filter. Single /position requests that arrive
+# together are evaluated as one NumPy batch; /positions takes a whole batch in one call.
+# /metrics serves Prometheus text: per-route latency histograms plus cache and batch counters.
+
+import argparse, asyncio, json, sys, time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+from query_cli import QueryEngine, QueryError, check_day, check_limit, normalise_where
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+CACHE_SIZE = 4096
+CACHE_TTL = 60.0            # seconds
+BATCH_WINDOW = 0.0005       # seconds a /position request waits for others to share its batch
+MAX_BATCH = 512
+MAX_BULK = 10_000           # positions per /positions call
+MAX_BODY = 1 << 20
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+_dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class TTLCache:
+    """LRU cache whose entries also expire ttl seconds after they were stored."""
+
+    def __init__(self, size=CACHE_SIZE, ttl=CACHE_TTL, clock=time.monotonic):
+        self.size = size
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()  # key -> (expires, value)
+        self.hits = self.misses = self.evictions = self.expired = 0
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        if item[0] < self.clock():
+            del self._data[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def put(self, key, value):
+        if self.size <= 0:
+            return
+        self._data[key] = (self.clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, ms):
+        for i, bound in enumerate(self.buckets):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += ms
+        self.count += 1
+
+
+class PositionBatcher:
+    """Coalesces single-position requests from concurrent clients into one Ephemeris.batch call."""
+
+    def __init__(self, ephemeris, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.ephemeris = ephemeris
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = []  # (key, day, future)
+        self._timer = None
+        self.batches = self.items = 0
+
+    def position(self, key, day):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((key, day, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return future
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self.batches += 1
+        self.items += len(pending)
+        results = self.ephemeris.batch([p[0] for p in pending], [p[1] for p in pending])
+        for (_, _, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class QueryService:
+    def __init__(self, engine=None, cache_size=CACHE_SIZE, ttl=CACHE_TTL, batch_window=BATCH_WINDOW):
+        self.engine = engine or QueryEngine()
+        self.cache = TTLCache(cache_size, ttl)
+        self.batcher = PositionBatcher(self.engine.ephemeris, batch_window)
+        self.engine.ephemeris.batch([], [])  # pay for the NumPy import now, not on the first request
+        self.latency = {}        # route -> Histogram
+        self.responses = {}      # (route, status) -> count
+        self.connections = 0
+        self.started = time.time()
+        self.routes = {
+            "/lookup": self.lookup,
+            "/query": self.query,
+            "/position": self.position,
+            "/positions": self.bulk_positions,
+            "/metrics": self.metrics,
+            "/health": self.health,
+        }
+
+    # ---------- HTTP ----------
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._send(writer, e.status, _dumps({"ok": False, "error": str(e)}).encode(), False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload, ctype = await self.dispatch(method, target, body)
+                await self._send(writer, status, payload, keep_alive, ctype)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise HTTPError(400, "bad Content-Length")
+        if length > MAX_BODY:
+            raise HTTPError(413, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    async def _send(writer, status, payload, keep_alive, ctype="application/json"):
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {ctype}\r\nContent-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + payload)
+        await writer.drain()
+
+    async def dispatch(self, method, target, body):
+        t0 = time.perf_counter()
+        url = urlsplit(target)
+        route = url.path.rstrip("/") or "/"
+        handler = self.routes.get(route)
+        ctype = "application/json"
+        try:
+            if handler is None:
+                raise HTTPError(404, f"no route {url.path!r}; try {', '.join(self.routes)}")
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if method == "POST" and body:
+                try:
+                    params["body"] = json.loads(body)
+                except ValueError as e:
+                    raise HTTPError(400, f"body is not JSON: {e}")
+            elif method not in ("GET", "POST"):
+                raise HTTPError(405, f"{method} not allowed")
+            status, payload = 200, await handler(params)
+            if route == "/metrics":
+                ctype = "text/plain; version=0.0.4"
+        except HTTPError as e:
+            status, payload = e.status, _dumps({"ok": False, "error": str(e)}).encode()
+        except QueryError as e:
+            status, payload = 400, _dumps({"ok": False, "error": str(e)}).encode()
+        except Exception as e:  # keep serving; report it to the caller
+            status, payload = 500, _dumps({"ok": False, "error": f"{type(e).__name__}: {e}"}).encode()
+        name = route if handler is not None else "other"
+        self.latency.setdefault(name, Histogram()).observe((time.perf_counter() - t0) * 1000)
+        self.responses[(name, status)] = self.responses.get((name, status), 0) + 1
+        return status, payload, ctype
+
+    # ---------- routes ----------
+    def _cached(self, key, compute):
+        payload = self.cache.get(key)
+        if payload is None:
+            payload = _dumps({"ok": True, "result": compute()}).encode()
+            self.cache.put(key, payload)
+        return payload
+
+    async def lookup(self, params):
+        name = self._param(params, "name").strip().lower()
+        return self._cached(("lookup", name), lambda: self.engine.lookup(name))
+
+    async def query(self, params):
+        spec = params.get("body")
+        if spec is None:
+            limit = self._number(params, "limit", None)
+            spec = {"where": self._json_param(params, "where", {}),
+                    "fields": params["fields"].split(",") if params.get("fields") else None,
+                    "limit": int(limit) if limit is not None and limit.is_integer() else limit}
+        if not isinstance(spec, dict):
+            raise QueryError("query body must be a JSON object")
+        where, fields = normalise_where(spec.get("where", {})), spec.get("fields")
+        limit = check_limit(spec.get("limit"))  # before it goes into the (hashed) key
+        key = ("query", _dumps(where), _dumps(fields), limit)
+        return self._cached(key, lambda: self.engine.query(where, fields, limit))
+
+    async def position(self, params):
+        day = check_day(self._number(params, "day", self.engine.ephemeris.epoch))
+        names = params.get("names")
+        if "name" in params:
+            key = self.engine.orbit_keys([params["name"]])[0]
+            cache_key = ("position", key, float(day))
+            payload = self.cache.get(cache_key)
+            if payload is None:
+                payload = _dumps({"ok": True, "result": await self.batcher.position(key, day)}).encode()
+                self.cache.put(cache_key, payload)
+            return payload
+        keys = self.engine.orbit_keys(names.split(",") if names else None)
+        return self._cached(("positions", tuple(keys), float(day)),
+                            lambda: self.engine.ephemeris.batch(keys, [day] * len(keys)))
+
+    async def bulk_positions(self, params):
+        body = params.get("body")
+        items = body.get("requests") if isinstance(body, dict) else body
+        if not isinstance(items, list):
+            raise HTTPError(400, 'POST a JSON list, or {"requests": [...]}, of {"name", "day"} objects')
+        if len(items) > MAX_BULK:
+            raise HTTPError(413, f"at most {MAX_BULK} positions per call")
+        keys, days, slots, results = [], [], [], [None] * len(items)
+        for i, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise QueryError("each request must be an object")
+                day = check_day(item.get("day", self.engine.ephemeris.epoch))
+                key = self.engine.orbit_keys([item.get("name")])[0]
+            except QueryError as e:
+                results[i] = {"error": str(e)}
+                continue
+            keys.append(key)
+            days.append(day)
+            slots.append(i)
+        for i, result in zip(slots, self.engine.ephemeris.batch(keys, days)):
+            results[i] = result
+        return _dumps({"ok": True, "result": results}).encode()
+
+    async def health(self, params):
+        return _dumps({"ok": True, "result": {"uptime_s": round(time.time() - self.started, 1)}}).encode()
+
+    async def metrics(self, params):
+        lines = ["# TYPE cbf_request_latency_ms histogram"]
+        for route, hist in sorted(self.latency.items()):
+            running = 0
+            for bound, count in zip(list(hist.buckets) + ["+Inf"], hist.counts):
+                running += count
+                lines.append(f'cbf_request_latency_ms_bucket{{route="{route}",le="{bound}"}} {running}')
+            lines.append(f'cbf_request_latency_ms_sum{{route="{route}"}} {hist.total:.3f}')
+            lines.append(f'cbf_request_latency_ms_count{{route="{route}"}} {hist.count}')
+        lines.append("# TYPE cbf_responses_total counter")
+        for (route, status), count in sorted(self.responses.items()):
+            lines.append(f'cbf_responses_total{{route="{route}",status="{status}"}} {count}')
+        c, b = self.cache, self.batcher
+        lines += [
+            "# TYPE cbf_cache_hits_total counter", f"cbf_cache_hits_total {c.hits}",
+            "# TYPE cbf_cache_misses_total counter", f"cbf_cache_misses_total {c.misses}",
+            "# TYPE cbf_cache_evictions_total counter", f"cbf_cache_evictions_total {c.evictions}",
+            "# TYPE cbf_cache_expired_total counter", f"cbf_cache_expired_total {c.expired}",
+            "# TYPE cbf_cache_entries gauge", f"cbf_cache_entries {len(c)}",
+            "# TYPE cbf_position_batches_total counter", f"cbf_position_batches_total {b.batches}",
+            "# TYPE cbf_position_batched_items_total counter", f"cbf_position_batched_items_total {b.items}",
+            "# TYPE cbf_open_connections gauge", f"cbf_open_connections {self.connections}",
+        ]
+        return ("\n".join(lines) + "\n").encode()
+
+    # ---------- parameters ----------
+    @staticmethod
+    def _param(params, name):
+        if name not in params:
+            raise HTTPError(400, f"missing parameter {name!r}")
+        return params[name]
+
+    @staticmethod
+    def _number(params, name, default):
+        if name not in params:
+            return default
+        try:
+            return float(params[name])
+        except ValueError:
+            raise HTTPError(400, f"{name} must be a number")
+
+    @staticmethod
+    def _json_param(params, name, default):
+        if name not in params:
+            return default
+        try:
+            return json.loads(params[name])
+        except ValueError as e:
+            raise HTTPError(400, f"{name} is not JSON: {e}")
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, **service_kw):
+    service = QueryService(**service_kw)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"[server] listening on http://{host}:{port}", file=sys.stderr, flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve body lookups and positions over local HTTP.")
+    ap.add_argument("--host", default=DEFAULT_HOST)
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="cached responses (0 disables)")
+    ap.add_argument("--ttl", type=float, default=CACHE_TTL, help="seconds a cached response stays valid")
+    ap.add_argument("--batch-window", type=float, default=BATCH_WINDOW * 1000, metavar="MS")
+    ap.add_argument("--snapshot", help="snapshot.py file whose state positions start from")
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, engine=QueryEngine(args.snapshot), cache_size=args.cache_size,
+                          ttl=args.ttl, batch_window=args.batch_window / 1000))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# render_worker.py
+# Draws the simulation on a background thread into offscreen pygame Surfaces.
+# The UI thread only blits the newest finished frame to the display and flips, so its
+# cost stays the same however expensive the scene gets.
+
+import threading, time
+from collections import deque
+
+import pygame
+
+
+class RenderWorker(threading.Thread):
+    """
+    Background renderer with a latest-frame-wins handoff.
+
+    draw(surface)         -- called on the worker thread to render one frame
+    handle_input(event)   -- called on the worker thread for each posted event, between
+                             frames; a non-None return value is queued back to the UI thread
+                             (see poll()). ("resize", size) events are applied by the worker
+                             first and then passed on as well.
+
+    Events go UI -> worker and replies go worker -> UI through deques, whose append/popleft
+    are atomic, so neither side ever blocks on the other. Frames are recycled through a small
+    buffer pool: a frame that is replaced before the UI takes it is dropped, not queued.
+    """
+
+    def __init__(self, draw, size, target_fps=60, handle_input=None):
+        super().__init__(name="render-worker", daemon=True)
+        self.draw = draw
+        self.handle_input = handle_input
+        self.size = (max(1, size[0]), max(1, size[1]))
+        self.frame_interval = 1.0 / target_fps
+
+        self._inbox = deque()
+        self._outbox = deque()
+        self._free = deque()
+        self._frame_lock = threading.Lock()  # guards only the single published-frame slot
+        self._frame = None
+        self._stopping = threading.Event()
+
+        self.frames_rendered = 0
+        self.frames_dropped = 0
+        self.last_render_ms = 0.0
+
+    # ---------- UI thread ----------
+    def post(self, event):
+        self._inbox.append(event)
+
+    def poll(self):
+        """Yield replies produced by handle_input since the last call."""
+        while self._outbox:
+            yield self._outbox.popleft()
+
+    def take_frame(self):
+        with self._frame_lock:
+            frame, self._frame = self._frame, None
+        return frame
+
+    def release_frame(self, frame):
+        """Give a presented frame back to the pool."""
+        if frame.get_size() == self.size:
+            self._free.append(frame)
+
+    def resize(self, size):
+        self.post(("resize", size))
+
+    def stop(self):
+        self._stopping.set()
+
+    # ---------- worker thread ----------
+    def run(self):
+        next_frame = time.perf_counter()
+        while not self._stopping.is_set():
+            self._drain_inbox()
+            surface = self._free.popleft() if self._free else pygame.Surface(self.size)
+            start = time.perf_counter()
+            try:
+                self.draw(surface)
+            except Exception as e:
+                print(f"Render worker error: {e}")
+                self._stopping.wait(1.0)
+                continue
+            self.last_render_ms = (time.perf_counter() - start) * 1000
+            self._publish(surface)
+
+            next_frame = max(next_frame + self.frame_interval, time.perf_counter())
+            self._stopping.wait(next_frame - time.perf_counter())
+
+    def _drain_inbox(self):
+        while self._inbox:
+            event = self._inbox.popleft()
+            if event[0] == "resize":
+                size = (max(1, event[1][0]), max(1, event[1][1]))
+                if size == self.size:
+                    continue
+                self.size = size
+                self._free.clear()
+                event = ("resize", size)
+            if self.handle_input is not None:
+                try:
+                    reply = self.handle_input(event)
+                except Exception as e:  # a bad event must not take the render thread down
+                    print(f"Render worker input error ({event[0]}): {e}")
+                    continue
+                if reply is not None:
+                    self._outbox.append(reply)
+
+    def _publish(self, surface):
+        with self._frame_lock:
+            old, self._frame = self._frame, surface
+        self.frames_rendered += 1
+        if old is not None:
+            self.frames_dropped += 1
+            self.release_frame(old)
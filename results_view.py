@@ -0,0 +1,262 @@
+# results_view.py
+# Virtualized, sortable result list for Tk.
+# Only the rows that fit in the viewport exist as canvas items; scrolling re-points that
+# fixed pool at a different slice of the row array, so a million results cost the same
+# widgets as ten.
+
+import bisect
+import tkinter as tk
+
+
+class VirtualList(tk.Frame):
+    """
+    columns   -- list of (title, width_px)
+    on_select -- optional callback(row) when a row is clicked
+
+    Rows are plain tuples, one value per column. Use set_rows() to replace the data,
+    append_rows() for incremental results, or stream_rows() to pull from an iterator in
+    chunks between Tk events.
+    """
+
+    ROW_HEIGHT = 22
+
+    def __init__(self, parent, columns, on_select=None, font=("Consolas", 11),
+                 bg="#0b0f1a", fg="white", header_bg="#1c2230", header_fg="#00e6ff",
+                 select_bg="#24314a", **kw):
+        super().__init__(parent, bg=bg, **kw)
+        self.columns = list(columns)
+        self.on_select = on_select
+        self.font, self.bg, self.fg, self.select_bg = font, bg, fg, select_bg
+
+        self.rows = []
+        self.first = 0           # index of the row shown at the top
+        self.selected = None     # index into self.rows
+        self.sort_col = None
+        self.sort_reverse = False
+        self._pool = []          # [(background_rect, [text_item per column]), ...]
+        self._redraw_pending = False
+        self._stream_id = None
+
+        self.caption = tk.Label(self, text="", anchor="w", font=font, bg=bg, fg=fg,
+                                justify="left", wraplength=420)
+        self.caption.pack(fill="x", padx=10, pady=(6, 4))
+
+        self._header_colors = (header_bg, header_fg)
+        self.header = tk.Frame(self, bg=header_bg)
+        self.header.pack(fill="x")
+        self._headers = []
+        self._build_headers()
+
+        body = tk.Frame(self, bg=bg)
+        body.pack(fill="both", expand=True)
+        self.canvas = tk.Canvas(body, bg=bg, highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self._ensure_pool())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+
+    def _build_headers(self):
+        header_bg, header_fg = self._header_colors
+        for lbl in self._headers:
+            lbl.destroy()
+        self._headers = []
+        for i, (title, width) in enumerate(self.columns):
+            lbl = tk.Label(self.header, text=title, anchor="w", font=(self.font[0], self.font[1], "bold"),
+                           bg=header_bg, fg=header_fg, cursor="hand2")
+            lbl.place(x=self._col_x(i), y=0, width=width, height=self.ROW_HEIGHT)
+            lbl.bind("<Button-1>", lambda e, c=i: self.sort_by(c))
+            self._headers.append(lbl)
+        self.header.configure(height=self.ROW_HEIGHT, width=self._col_x(len(self.columns)))
+
+    def set_columns(self, columns):
+        """Switch to a different column layout; clears the rows and the sort."""
+        columns = list(columns)
+        if columns == self.columns:
+            return
+        self.set_rows([])
+        self.columns = columns
+        self.sort_col, self.sort_reverse = None, False
+        self._build_headers()
+        for rect, texts in self._pool:
+            self.canvas.delete(rect, *texts)
+        self._pool = []
+        self._ensure_pool()
+
+    # ---------- data ----------
+    def set_rows(self, rows, caption=None):
+        self.cancel_stream()
+        self.rows = list(rows)
+        if self.sort_col is not None:
+            self._sort()
+        self.first = 0
+        self.selected = None
+        if caption is not None:
+            self.caption.config(text=caption)
+        self._schedule_redraw()
+
+    def append_rows(self, rows):
+        if self.sort_col is None:
+            self.rows.extend(rows)
+        else:
+            self._merge(rows)
+        self._schedule_redraw()
+
+    def _merge(self, rows):
+        """
+        Sorted insert of a whole chunk. Inserting row by row shifts the tail every time,
+        O(n) per row; instead sort the chunk, bisect each insertion point and rebuild the
+        list once, so a chunk costs one copy of the list plus k log n key calls.
+        """
+        key = self._sort_key()
+        rows = sorted(rows, key=key, reverse=self.sort_reverse)
+        points, lo = [], 0
+        for row in rows:
+            if self.sort_reverse:
+                # bisect only understands ascending order; search the descending list by hand
+                lo = self._reverse_insert_point(key(row), key, lo)
+            else:
+                lo = bisect.bisect_right(self.rows, key(row), lo=lo, key=key)
+            points.append(lo)
+        merged, prev = [], 0
+        for point, row in zip(points, rows):
+            merged += self.rows[prev:point]
+            merged.append(row)
+            prev = point
+        merged += self.rows[prev:]
+        self.rows = merged
+        if self.selected is not None:
+            self.selected += bisect.bisect_right(points, self.selected)
+
+    def stream_rows(self, iterator, chunk=2000, on_done=None):
+        """Append rows from iterator a chunk at a time so Tk stays responsive."""
+        self.cancel_stream()
+        iterator = iter(iterator)
+
+        def pump():
+            batch = []
+            for row in iterator:
+                batch.append(row)
+                if len(batch) >= chunk:
+                    break
+            if batch:
+                self.append_rows(batch)
+            if len(batch) >= chunk:
+                self._stream_id = self.after(1, pump)
+            else:
+                self._stream_id = None
+                if on_done is not None:
+                    on_done(len(self.rows))
+
+        self._stream_id = self.after_idle(pump)
+
+    def cancel_stream(self):
+        if self._stream_id is not None:
+            self.after_cancel(self._stream_id)
+            self._stream_id = None
+
+    def sort_by(self, col):
+        if self.sort_col == col:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_col, self.sort_reverse = col, False
+        for i, lbl in enumerate(self._headers):
+            arrow = (" ▼" if self.sort_reverse else " ▲") if i == col else ""
+            lbl.config(text=self.columns[i][0] + arrow)
+        self._sort()
+        self.selected = None
+        self._schedule_redraw()
+
+    def _sort_key(self):
+        col = self.sort_col
+        # Numbers before strings so mixed columns still sort instead of raising.
+        return lambda row: (0, row[col], "") if isinstance(row[col], (int, float)) else (1, 0, str(row[col]).lower())
+
+    def _sort(self):
+        self.rows.sort(key=self._sort_key(), reverse=self.sort_reverse)
+
+    def _reverse_insert_point(self, k, key, lo=0):
+        hi = len(self.rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key(self.rows[mid]) >= k:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    # ---------- scrolling ----------
+    def visible_count(self):
+        return max(1, self.canvas.winfo_height() // self.ROW_HEIGHT)
+
+    def scroll(self, amount, what="units"):
+        step = self.visible_count() if what == "pages" else 1
+        self.scroll_to(self.first + int(amount) * step)
+
+    def scroll_to(self, index):
+        top = max(0, min(int(index), len(self.rows) - self.visible_count()))
+        if top != self.first:
+            self.first = top
+            self._schedule_redraw()
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.scroll_to(float(args[0]) * len(self.rows))
+        elif action == "scroll":
+            self.scroll(int(args[0]), args[1])
+
+    # ---------- drawing ----------
+    def _col_x(self, col):
+        return 8 + sum(width for _, width in self.columns[:col])
+
+    def _ensure_pool(self):
+        needed = self.visible_count() + 1
+        right = self._col_x(len(self.columns)) + 2000
+        while len(self._pool) < needed:
+            y = len(self._pool) * self.ROW_HEIGHT
+            rect = self.canvas.create_rectangle(0, y, right, y + self.ROW_HEIGHT,
+                                                fill=self.bg, outline="")
+            texts = [self.canvas.create_text(self._col_x(c), y + self.ROW_HEIGHT // 2, anchor="w",
+                                             font=self.font, fill=self.fg, text="")
+                     for c in range(len(self.columns))]
+            self._pool.append((rect, texts))
+        self.scroll_to(self.first)
+        self._schedule_redraw()
+
+    def _schedule_redraw(self):
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self._redraw)
+
+    def _redraw(self):
+        self._redraw_pending = False
+        total = len(self.rows)
+        for slot, (rect, texts) in enumerate(self._pool):
+            idx = self.first + slot
+            row = self.rows[idx] if idx < total else None
+            self.canvas.itemconfigure(rect, fill=self.select_bg if idx == self.selected else self.bg)
+            for c, item in enumerate(texts):
+                self.canvas.itemconfigure(item, text="" if row is None else self._format(row[c]))
+        if total:
+            shown = self.visible_count()
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + shown) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    @staticmethod
+    def _format(value):
+        if isinstance(value, float):
+            return f"{value:,.4g}"
+        return str(value)
+
+    def _on_click(self, event):
+        idx = self.first + event.y // self.ROW_HEIGHT
+        if 0 <= idx < len(self.rows):
+            self.selected = idx
+            self._schedule_redraw()
+            if self.on_select is not None:
+                self.on_select(self.rows[idx])
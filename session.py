@@ -0,0 +1,214 @@
+# session.py
+# Tk-free simulation state and per-frame logic.
+# AstronomyApp builds its widgets on top of this; headless tools (session replay) drive it
+# directly with an offscreen pygame Surface.
+
+import hashlib, random
+from collections import deque
+
+from simulation import PLANET_DATA, SOLAR_SYSTEM, BLACK, PX_PER_AU
+from sphere_render import SphereRenderer
+from pixel_plot import plot_points
+from close_approach import CloseApproachDetector
+from quality import DEFAULT_TIER, tier_by_name
+
+MODEL_VIEW_SIZE = 160  # px, 3-D view of the selected body in the simulation corner
+BELT_COLOR = (150, 135, 115)
+APPROACH_ALERT_AU = 0.3
+
+
+class SimulationSession:
+    def __init__(self, star_seed=None):
+        self.time_factor = 0.5
+        self.is_paused = False
+        self.star_seed = random.randrange(2 ** 32) if star_seed is None else star_seed
+        self.star_rng = random.Random(self.star_seed)
+        self.sphere_renderer = SphereRenderer()
+        self.model_spin = 0.0
+        self.frame_index = 0
+        self.recorder = None  # session_replay.SessionRecorder while recording
+        self.belt = None      # sharded_propagation.ShardedPropagator for an asteroid belt scene
+        self.checkpointer = None  # snapshot.Checkpointer for periodic checkpoints of long runs
+        self.sim_days = 0.0   # time_factor is days per frame
+        self.approach_detector = CloseApproachDetector(APPROACH_ALERT_AU * PX_PER_AU)
+        self.approach_events = deque(maxlen=1000)  # (day, body_a, body_b, distance_au), newest last
+        self.approach_count = 0                    # total ever detected; the deque only keeps the latest
+        self.quality = tier_by_name(DEFAULT_TIER)  # quality.QualityTier the frame is drawn at
+        self.trails = {}                           # body name -> deque of recent (x, y)
+
+    # ---------- large scenes ----------
+    def enable_belt(self, count, workers=None, seed=0):
+        """Add an asteroid belt of count particles between Mars and Jupiter."""
+        from sharded_propagation import ShardedPropagator
+        self.disable_belt()
+        self.belt = ShardedPropagator.asteroid_belt(count, seed=seed, workers=workers).start()
+
+    def disable_belt(self):
+        if self.belt is not None:
+            belt, self.belt = self.belt, None
+            belt.close()
+
+    # ---------- checkpoints ----------
+    def start_checkpoints(self, directory, every=None):
+        """Write snapshot.Checkpointer checkpoints of this session into directory while it runs."""
+        import snapshot
+        self.stop_checkpoints()
+        self.checkpointer = snapshot.Checkpointer(directory, every or snapshot.CHECKPOINT_EVERY)
+
+    def stop_checkpoints(self):
+        if self.checkpointer is not None:
+            checkpointer, self.checkpointer = self.checkpointer, None
+            checkpointer.close()
+
+    # ---------- recording ----------
+    def record(self, kind, *args):
+        if self.recorder is not None:
+            self.recorder.record(self.frame_index, kind, *args)
+
+    # ---------- state changes ----------
+    def select_body(self, name):
+        obj = SOLAR_SYSTEM.get(name)
+        if obj is not None:
+            self.highlight_object(obj)
+        return obj
+
+    def highlight_object(self, selected_obj):
+        for body in PLANET_DATA:
+            body.is_highlighted = (body == selected_obj)
+
+    def hit_test(self, pos):
+        for body in PLANET_DATA:
+            if body.is_clicked(pos):
+                return body.name.lower()
+        return None
+
+    def set_quality(self, tier):
+        """Draw at quality.QualityTier tier from the next frame on."""
+        self.apply_input("quality", tier.name)
+
+    def set_time_factor(self, value):
+        self.apply_input("time", float(value))
+
+    def apply_input(self, kind, *args):
+        """
+        Record one user input against the current frame and apply it. Must run between
+        frames (on the render worker while one runs); session_replay feeds recorded events
+        back through here. Returns the selected body name for "search", "select" and "click".
+        """
+        self.record(kind, *args)
+        if kind in ("search", "select"):
+            return args[0] if self.select_body(args[0]) is not None else None
+        if kind == "click":
+            name = self.hit_test(args)
+            if name is not None:
+                self.select_body(name)
+            return name
+        if kind == "time":
+            self.time_factor = float(args[0])
+        elif kind == "pause":
+            self.is_paused = not self.is_paused
+        elif kind == "reset":
+            self.reset_state()
+        elif kind == "quality":
+            self.quality = tier_by_name(args[0])
+        else:
+            raise ValueError(f"Unknown input {kind!r}")
+        return None
+
+    def reset_bodies(self):
+        for body in PLANET_DATA:
+            body.angle = 0
+        self.trails.clear()
+        self.sim_days = 0.0
+        self.approach_detector.reset()
+
+    def reset_state(self):
+        self.reset_bodies()
+        self.time_factor = 0.5
+        self.is_paused = False
+        self.select_body("earth")
+
+    def state_checksum(self):
+        h = hashlib.sha1()
+        for body in PLANET_DATA:
+            h.update(repr((body.name, body.angle, body.x, body.y, body.is_highlighted)).encode())
+        h.update(repr((self.time_factor, self.is_paused)).encode())
+        return h.hexdigest()
+
+    # ---------- per-frame ----------
+    def simulate_frame(self, surface):
+        self.frame_index += 1
+        surface.fill(BLACK)
+
+        self.draw_stars(surface)
+
+        center_x, center_y = surface.get_width() / 2, surface.get_height() / 2
+
+        if self.belt is not None:
+            if not self.is_paused:
+                self.belt.step(self.time_factor, center_x, center_y)
+            plot_points(surface, self.belt.x, self.belt.y, BELT_COLOR)
+
+        quality = self.quality
+        for body in PLANET_DATA:
+            if body.has_rings:
+                body.ring_system().detail = quality.ring_scale
+            if not self.is_paused:
+                body.update_position(self.time_factor, center_x, center_y)
+                if quality.trail_length:
+                    self.extend_trail(body, quality.trail_length)
+        if quality.trail_length:
+            self.draw_trails(surface)
+        elif self.trails:
+            self.trails.clear()
+        for body in PLANET_DATA:
+            body.draw(surface, center_x, center_y, label=quality.labels, orbit_segments=quality.orbit_segments)
+
+        if not self.is_paused:
+            self.sim_days += self.time_factor
+            self.check_approaches()
+
+        self.draw_model_view(surface)
+
+        if self.checkpointer is not None:
+            self.checkpointer.maybe_save(self)
+
+    def check_approaches(self):
+        xs = [body.x for body in PLANET_DATA]
+        ys = [body.y for body in PLANET_DATA]
+        for event in self.approach_detector.update(self.sim_days, xs, ys):
+            self.approach_events.append((round(event.time, 1), PLANET_DATA[event.a].name,
+                                         PLANET_DATA[event.b].name, round(event.distance / PX_PER_AU, 3)))
+            self.approach_count += 1
+
+    def draw_stars(self, surface):
+        import pygame
+        rng = self.star_rng
+        for _ in range(self.quality.stars):
+            x = rng.randint(0, surface.get_width())
+            y = rng.randint(0, surface.get_height())
+            brightness = rng.randint(100, 255)
+            pygame.draw.circle(surface, (brightness, brightness, brightness), (x, y), 1)
+
+    def extend_trail(self, body, length):
+        trail = self.trails.get(body.name)
+        if trail is None or trail.maxlen != length:
+            trail = self.trails[body.name] = deque(trail or (), maxlen=length)
+        trail.append((body.x, body.y))
+
+    def draw_trails(self, surface):
+        import pygame
+        for body in PLANET_DATA:
+            trail = self.trails.get(body.name)
+            if trail is not None and len(trail) > 1:
+                color = tuple(c // 3 for c in body.color)
+                pygame.draw.lines(surface, color, False, list(trail), 1)
+
+    def draw_model_view(self, surface):
+        selected = next((body for body in PLANET_DATA if body.is_highlighted), None)
+        if selected is None:
+            return
+        if not self.is_paused:
+            self.model_spin += 0.05 * self.time_factor
+        model = self.sphere_renderer.render(selected, MODEL_VIEW_SIZE, self.model_spin)
+        surface.blit(model, (10, 10))
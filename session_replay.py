@@ -0,0 +1,184 @@
+# session_replay.py
+# Record a live session's input stream and replay it headlessly as a perf/correctness test.
+#
+#   python main.py --record run.cbfs.gz      # use the app normally, then close the window
+#   python session_replay.py run.cbfs.gz     # replay as fast as possible, print timings + checksum
+#
+# Log format: gzip'd text, one JSON value per line.
+#   line 1   header {"version", "seed", "size", "time_factor", "paused", "model_spin", "frame",
+#                   "belt", "quality", "bodies": [[angle, highlighted], ...]}
+#   then     [frame, ms_since_start, kind, *args]   for each input event ("load" names a
+#            snapshot.py file, which must still exist when the log is replayed)
+#   last     [frame, ms_since_start, "end", state_checksum]
+# Events are keyed by the frame they arrived before, so replay uses a fixed per-frame
+# clock instead of wall time. Only the inputs are stored; the simulation is re-run.
+# With the render worker running, the header, every event and the final checksum are taken
+# on the worker between frames (see AstronomyApp.send_input), never from the Tk thread.
+
+import argparse, gzip, json, os, sys, threading, time, zlib
+
+LOG_VERSION = 1
+
+
+class SessionRecorder:
+    def __init__(self, path, session, size):
+        from simulation import PLANET_DATA
+        self.path = path
+        self._lock = threading.Lock()  # UI and render worker can both record
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._t0 = time.perf_counter()
+        header = {
+            "version": LOG_VERSION,
+            "seed": session.star_seed,
+            "size": list(size),
+            "time_factor": session.time_factor,
+            "paused": session.is_paused,
+            "model_spin": session.model_spin,
+            "frame": session.frame_index,
+            "belt": session.belt.n if session.belt is not None else 0,
+            "quality": session.quality.name,
+            "bodies": [[body.angle, body.is_highlighted] for body in PLANET_DATA],
+        }
+        self._write(header)
+
+    def _write(self, value):
+        self._file.write(json.dumps(value, separators=(",", ":")) + "\n")
+
+    def record(self, frame, kind, *args):
+        ms = round((time.perf_counter() - self._t0) * 1000, 1)
+        with self._lock:
+            if self._file is not None:
+                self._write([frame, ms, kind, *args])
+
+    def close(self, frame, checksum):
+        self.record(frame, "end", checksum)
+        with self._lock:
+            self._file.close()
+            self._file = None
+
+
+def start_recording(session, path, size):
+    session.recorder = SessionRecorder(path, session, size)
+    return session.recorder
+
+
+def stop_recording(session):
+    if session.recorder is not None:
+        recorder, session.recorder = session.recorder, None
+        recorder.close(session.frame_index, session.state_checksum())
+
+
+def load_session(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != LOG_VERSION:
+            raise ValueError(f"Unsupported session log version: {header.get('version')}")
+        events = [json.loads(line) for line in f if line.strip()]
+    return header, events
+
+
+class Replayer:
+    """Re-runs a recorded session through SimulationSession on an offscreen Surface."""
+
+    def __init__(self, header, events):
+        self.header = header
+        self.events = events
+        self.frame_times = []
+        self.frame_crc = 0
+
+    def _prepare(self):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import pygame
+        from session import SimulationSession
+        from simulation import PLANET_DATA
+        from quality import DEFAULT_TIER, tier_by_name
+
+        pygame.font.init()
+        session = SimulationSession(star_seed=self.header["seed"])
+        session.time_factor = self.header["time_factor"]
+        session.is_paused = self.header["paused"]
+        session.model_spin = self.header.get("model_spin", 0.0)
+        session.frame_index = self.header.get("frame", 0)
+        session.quality = tier_by_name(self.header.get("quality", DEFAULT_TIER))
+        for body, (angle, highlighted) in zip(PLANET_DATA, self.header["bodies"]):
+            body.angle, body.is_highlighted = angle, highlighted
+        if self.header.get("belt"):
+            session.enable_belt(self.header["belt"])
+        surface = pygame.Surface(tuple(self.header["size"]))
+        return session, surface
+
+    def _apply(self, session, surface, kind, args):
+        import pygame
+        if kind == "load":
+            import snapshot
+            snapshot.load(session, args[0])
+        elif kind == "resize":
+            surface = pygame.Surface((max(1, args[0]), max(1, args[1])))
+        else:
+            session.apply_input(kind, *args)
+        return surface
+
+    def run(self):
+        """Replay every frame. Returns (state_checksum, recorded_checksum_or_None)."""
+        import pygame
+        session, surface = self._prepare()
+        end = None
+        self.frame_times = []
+        # Frames are simulated up to each event's frame, then the event is applied. This
+        # follows session.frame_index rather than a counter because a "load" event restores
+        # the snapshot's frame number, and later events were recorded against that.
+        for event in self.events:
+            while session.frame_index < event[0]:
+                t0 = time.perf_counter()
+                session.simulate_frame(surface)
+                self.frame_times.append(time.perf_counter() - t0)
+            if event[2] == "end":
+                end = event
+                break
+            surface = self._apply(session, surface, event[2], event[3:])
+
+        self.frame_crc = zlib.crc32(pygame.image.tobytes(surface, "RGB"))
+        session.disable_belt()
+        return session.state_checksum(), (end[3] if end else None)
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay a recorded Celestial Body Finder session headlessly.")
+    ap.add_argument("log", help="session log written by main.py --record")
+    ap.add_argument("--timings", help="write per-frame timings (ms) to this CSV file")
+    args = ap.parse_args(argv)
+
+    header, events = load_session(args.log)
+    replayer = Replayer(header, events)
+    t0 = time.perf_counter()
+    checksum, recorded = replayer.run()
+    total = time.perf_counter() - t0
+
+    times = sorted(replayer.frame_times)
+    n = len(times)
+    print(f"frames:   {n}  ({len(events)} events, seed {header['seed']})")
+    if n:
+        print(f"wall:     {total:.3f} s  ({n / total:.1f} frames/s)")
+        print(f"frame ms: mean {sum(times) / n * 1000:.3f}  p50 {_percentile(times, 0.5) * 1000:.3f}  "
+              f"p95 {_percentile(times, 0.95) * 1000:.3f}  max {times[-1] * 1000:.3f}")
+    print(f"checksum: {checksum}  framebuffer crc32 {replayer.frame_crc:08x}")
+    if args.timings:
+        with open(args.timings, "w") as f:
+            f.write("frame,ms\n")
+            for i, dt in enumerate(replayer.frame_times):
+                f.write(f"{i},{dt * 1000:.4f}\n")
+    if recorded is not None:
+        match = checksum == recorded
+        print(f"recorded: {recorded}  {'MATCH' if match else 'MISMATCH'}")
+        return 0 if match else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,6 @@
 
 # simulation.py
 import math
-import pygame
 
 # Colors
 WHITE = (255, 255, 255)
@@ -15,8 +14,22 @@ ORANGE = (255, 165, 0)
 BROWN = (200, 150, 100)
 LIGHT_BROWN = (210, 180, 140)
 
+# Scene scale: Earth's orbit is drawn at 120 px, so 1 AU == 120 px.
+PX_PER_AU = 120.0
+
+_UNIT_CIRCLES = {}
+
+
+def _unit_circle(segments):
+    points = _UNIT_CIRCLES.get(segments)
+    if points is None:
+        step = 2 * math.pi / segments
+        points = _UNIT_CIRCLES[segments] = [(math.cos(i * step), math.sin(i * step)) for i in range(segments)]
+    return points
+
 class CelestialBody:
-    def __init__(self, name, radius, color, orbit_distance, orbital_period, info_text, has_rings=False):
+    def __init__(self, name, radius, color, orbit_distance, orbital_period, info_text, has_rings=False,
+                 ring_particles=None):
         self.name = name
         self.radius = radius
         self.color = color
@@ -24,34 +37,54 @@ class CelestialBody:
         self.orbital_period = orbital_period
         self.info_text = info_text
         self.has_rings = has_rings
+        self.ring_particles = ring_particles  # None -> preset count from rings.py
+        self.rings = None  # rings.RingSystem, built on first use
         self.angle = 0
         self.x = 0
         self.y = 0
         self.is_highlighted = False
+        self._label = None  # rendered name, built on first draw
 
     def update_position(self, time_factor, center_x, center_y):
         if self.orbital_period != 0:
             self.angle += (2 * math.pi / self.orbital_period) * time_factor
         self.x = center_x + self.orbit_distance * math.cos(self.angle)
         self.y = center_y + self.orbit_distance * math.sin(self.angle)
+        if self.has_rings:
+            self.ring_system().step(time_factor)
+
+    def ring_system(self):
+        if self.rings is None:
+            from rings import ring_system_for
+            self.rings = ring_system_for(self.name, self.ring_particles)
+        return self.rings
 
-    def draw(self, screen, center_x, center_y):
-        if self.orbit_distance > 0:
-            pygame.draw.circle(screen, GRAY, (int(center_x), int(center_y)), int(self.orbit_distance), 1)
+    def draw(self, screen, center_x, center_y, label=True, orbit_segments=0):
+        """orbit_segments: 0 draws the exact orbit circle, N an N-sided polygon, None no orbit."""
+        import pygame  # imported here so headless tools can use the body data without it
+        if self.orbit_distance > 0 and orbit_segments is not None:
+            if orbit_segments:
+                r = self.orbit_distance
+                points = [(center_x + r * c, center_y + r * s) for c, s in _unit_circle(orbit_segments)]
+                pygame.draw.lines(screen, GRAY, True, points, 1)
+            else:
+                pygame.draw.circle(screen, GRAY, (int(center_x), int(center_y)), int(self.orbit_distance), 1)
 
-        if self.has_rings and self.name == "Saturn":
-            ring_radius1 = self.radius * 1.8
-            ring_radius2 = self.radius * 2.2
-            pygame.draw.circle(screen, LIGHT_BROWN, (int(self.x), int(self.y)), int(ring_radius2), 2)
-            pygame.draw.circle(screen, LIGHT_BROWN, (int(self.x), int(self.y)), int(ring_radius1), 2)
+        if self.has_rings:
+            self.ring_system().draw_back(screen, self.x, self.y, self.radius)
 
         pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), int(self.radius))
 
+        if self.has_rings:
+            self.ring_system().draw_front(screen, self.x, self.y, self.radius, self.radius)
+
         if self.is_highlighted:
             pygame.draw.circle(screen, LIGHT_GREEN, (int(self.x), int(self.y)), int(self.radius) + 3, 2)
 
-        font = pygame.font.Font(None, 24)
-        screen.blit(font.render(self.name, True, WHITE), (self.x + self.radius + 5, self.y - self.radius))
+        if label:
+            if self._label is None:  # the text never changes, so render it once
+                self._label = pygame.font.Font(None, 24).render(self.name, True, WHITE)
+            screen.blit(self._label, (self.x + self.radius + 5, self.y - self.radius))
 
     def get_info(self):
         return self.info_text
@@ -74,9 +107,11 @@ PLANET_DATA = [
     CelestialBody("Mars", 6, RED, 160, 687,
         "Name: Mars\nType: Planet\nMass: 6.39e23 kg\nGravity: 3.7 m/s²\nRadius: 3,389 km\nMoons: 2\n\nDescription: The 'Red Planet' with the largest volcano in the solar system - Olympus Mons."),
     CelestialBody("Jupiter", 18, BROWN, 220, 4333,
-        "Name: Jupiter\nType: Planet\nMass: 1.898e27 kg\nGravity: 24.8 m/s²\nRadius: 69,911 km\nMoons: 95\n\nDescription: The largest planet in our solar system. A gas giant with a famous Great Red Spot."),
+        "Name: Jupiter\nType: Planet\nMass: 1.898e27 kg\nGravity: 24.8 m/s²\nRadius: 69,911 km\nMoons: 95\n\nDescription: The largest planet in our solar system. A gas giant with a famous Great Red Spot.",
+        has_rings=True),
     CelestialBody("Saturn", 16, LIGHT_BROWN, 280, 10759, 
-        "Name: Saturn\nType: Planet\nMass: 5.683e26 kg\nGravity: 10.4 m/s²\nRadius: 58,232 km\nMoons: 146\n\nDescription: Known for its spectacular ring system made of ice and rock particles."),
+        "Name: Saturn\nType: Planet\nMass: 5.683e26 kg\nGravity: 10.4 m/s²\nRadius: 58,232 km\nMoons: 146\n\nDescription: Known for its spectacular ring system made of ice and rock particles.",
+        has_rings=True),
 ]
 
 SOLAR_SYSTEM = {body.name.lower(): body for body in PLANET_DATA}
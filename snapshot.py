@@ -0,0 +1,433 @@
+# snapshot.py
+# Versioned binary snapshots of a SimulationSession, plus periodic checkpoints for long runs.
+#
+#   python main.py --checkpoint runs/belt --belt 1000000   # checkpoint every 300 frames
+#   python main.py --restore runs/belt                     # resume from the newest checkpoint
+#   python snapshot.py runs/belt/ckpt-00000010-0000003000.cbsnap   # describe / time a restore
+#
+# File layout (little-endian):
+#   8 bytes   magic b"CBFSNAP\0"
+#   u32       format version
+#   u32       header length
+#   header    UTF-8 JSON {"kind", "base", "scalars", "arrays": [{"name", "dtype", "shape",
+#             "offset", "nbytes", "codec"}, ...]}
+#   blobs     one per array, each starting on a 64-byte boundary; header offsets count
+#             from the first blob
+#
+# Arrays are written straight from their buffers; nothing is pickled per object. A "full"
+# snapshot stores them raw, so loading maps the file and views the blobs in place, and
+# restore is one memcpy per array. A "delta" checkpoint stores each array XORed with the
+# same array in its base keyframe, byte-shuffled and zlib-compressed: unchanged arrays
+# (radius, omega) shrink to almost nothing, and moving ones keep their sign, exponent and
+# high mantissa bytes, which XOR to zero. A delta's base is always a full snapshot.
+#
+# Checkpoints are named ckpt-<write sequence>-<frame>.cbsnap. The sequence only grows, also
+# across runs into the same directory, so a restore that moves the frame number back never
+# reuses a name, and "newest" means the most recent write.
+
+import json, mmap, os, queue, struct, sys, threading, time, zlib
+
+import numpy as np
+
+MAGIC = b"CBFSNAP\0"
+SNAPSHOT_VERSION = 1
+ALIGN = 64
+SUFFIX = ".cbsnap"
+CHECKPOINT_EVERY = 300   # frames between checkpoints
+KEYFRAME_EVERY = 10      # every Nth checkpoint is a full snapshot, the others are deltas
+KEEP_KEYFRAMES = 2       # older checkpoint groups are deleted
+_PREFIX = struct.Struct("<8sII")
+
+
+class Snapshot:
+    """Loaded snapshot: scalars (dict) and arrays (name -> ndarray, possibly views into a map)."""
+
+    def __init__(self, scalars, arrays, kind="full", base=None, path=None):
+        self.scalars = scalars
+        self.arrays = arrays
+        self.kind = kind
+        self.base = base
+        self.path = path
+
+    @property
+    def frame(self):
+        return self.scalars["frame_index"]
+
+
+# ---------- capture / restore ----------
+def capture(session):
+    """Copy a session's state into a Snapshot (safe to write from another thread)."""
+    from simulation import PLANET_DATA
+    version, internal, gauss = session.star_rng.getstate()
+    scalars = {
+        "time_factor": session.time_factor,
+        "is_paused": session.is_paused,
+        "model_spin": session.model_spin,
+        "frame_index": session.frame_index,
+        "sim_days": session.sim_days,
+        "star_seed": session.star_seed,
+        "star_rng": [version, gauss],
+        "bodies": [body.name for body in PLANET_DATA],
+        "belt": session.belt.n if session.belt is not None else 0,
+        "quality": session.quality.name,
+        "rings": {},
+    }
+    arrays = {
+        "body.angle": np.array([body.angle for body in PLANET_DATA], dtype=np.float64),
+        "body.omega": np.array([2 * np.pi / body.orbital_period if body.orbital_period else 0.0
+                                for body in PLANET_DATA], dtype=np.float64),
+        "body.x": np.array([body.x for body in PLANET_DATA], dtype=np.float64),
+        "body.y": np.array([body.y for body in PLANET_DATA], dtype=np.float64),
+        "body.highlighted": np.array([body.is_highlighted for body in PLANET_DATA], dtype=np.uint8),
+        "star_rng": np.array(internal, dtype=np.uint32),
+    }
+    if session.belt is not None:
+        from sharded_propagation import FIELDS
+        for name in FIELDS:
+            arrays["belt." + name] = getattr(session.belt, name).copy()
+    for body in PLANET_DATA:
+        if body.rings is not None:
+            scalars["rings"][body.name] = {"particles": body.rings.particles, "density": body.rings.density,
+                                           "steps": body.rings._steps}
+            arrays[f"rings.{body.name}.angle"] = body.rings.angle.copy()
+    return Snapshot(scalars, arrays)
+
+
+def restore(session, snap):
+    """Put a session back into the captured state. Raises ValueError if the body set differs."""
+    from simulation import PLANET_DATA
+    s, a = snap.scalars, snap.arrays
+    names = [body.name for body in PLANET_DATA]
+    if s["bodies"] != names:
+        raise ValueError(f"Snapshot bodies {s['bodies']} do not match this build's {names}")
+
+    for i, body in enumerate(PLANET_DATA):
+        # Keep each attribute's Python type (the Sun's angle stays int 0) so that
+        # state_checksum() of a restored session equals the captured one's.
+        body.angle = type(body.angle)(a["body.angle"][i])
+        body.x = type(body.x)(a["body.x"][i])
+        body.y = type(body.y)(a["body.y"][i])
+        body.is_highlighted = bool(a["body.highlighted"][i])
+    session.time_factor = s["time_factor"]
+    session.is_paused = s["is_paused"]
+    session.model_spin = s["model_spin"]
+    session.frame_index = s["frame_index"]
+    session.sim_days = s["sim_days"]
+    session.star_seed = s["star_seed"]
+    version, gauss = s["star_rng"]
+    session.star_rng.setstate((version, tuple(a["star_rng"].tolist()), gauss))
+    if "quality" in s:
+        from quality import tier_by_name
+        session.quality = tier_by_name(s["quality"])
+        session.trails.clear()
+
+    for name, ring in s["rings"].items():
+        body = next(b for b in PLANET_DATA if b.name == name)
+        rings = body.ring_system()
+        if rings.particles != ring["particles"]:
+            body.ring_particles, body.rings = ring["particles"], None
+            rings = body.ring_system()
+        rings.angle[:] = a[f"rings.{name}.angle"]
+        rings.density = ring["density"]
+        rings._steps = ring["steps"]
+
+    _restore_belt(session, s["belt"], a)
+    # Encounters in progress are not part of the state; start watching afresh.
+    session.approach_detector.reset()
+    session.approach_events.clear()
+
+
+def _restore_belt(session, n, arrays):
+    if not n:
+        session.disable_belt()
+        return
+    from sharded_propagation import FIELDS, ShardedPropagator
+    if session.belt is None or session.belt.n != n:
+        session.disable_belt()
+        session.belt = ShardedPropagator(n)
+        fresh = True
+    else:
+        fresh = False
+    for name in FIELDS:
+        getattr(session.belt, name)[:] = arrays["belt." + name]
+    if fresh:
+        session.belt.start()
+
+
+# ---------- encoding ----------
+def _shuffle(raw, itemsize):
+    return raw.reshape(-1, itemsize).T.tobytes() if itemsize > 1 else raw.tobytes()
+
+
+def _unshuffle(data, itemsize, count):
+    b = np.frombuffer(data, dtype=np.uint8)
+    return b.reshape(itemsize, count).T.copy() if itemsize > 1 else b.copy()
+
+
+def _encode_delta(arr, base):
+    raw = np.ascontiguousarray(arr).view(np.uint8)
+    if base is not None and base.dtype == arr.dtype and base.shape == arr.shape:
+        raw = raw ^ np.ascontiguousarray(base).view(np.uint8)
+        codec = "xor-shuffle-zlib"
+    else:
+        codec = "shuffle-zlib"
+    return codec, zlib.compress(_shuffle(raw, arr.dtype.itemsize), 1)
+
+
+def _decode(entry, blob, base_arrays):
+    dtype, shape = np.dtype(entry["dtype"]), tuple(entry["shape"])
+    codec = entry["codec"]
+    if codec == "raw":
+        return np.frombuffer(blob, dtype=dtype).reshape(shape)
+    count = int(np.prod(shape, dtype=np.int64))
+    raw = _unshuffle(zlib.decompress(blob), dtype.itemsize, count).reshape(-1)
+    if codec == "xor-shuffle-zlib":
+        raw ^= np.ascontiguousarray(base_arrays[entry["name"]]).view(np.uint8).reshape(-1)
+    elif codec != "shuffle-zlib":
+        raise ValueError(f"Unknown snapshot codec {codec!r}")
+    return raw.view(dtype).reshape(shape)
+
+
+# ---------- files ----------
+def write_snapshot(path, snap, base=None, base_name=None):
+    """
+    Write snap to path atomically. With base (a Snapshot), arrays are stored as deltas
+    against it and base_name is recorded so readers can find the keyframe.
+    """
+    entries, blobs = [], []
+    for name, arr in snap.arrays.items():
+        arr = np.asarray(arr)
+        if base is None:
+            codec, blob = "raw", memoryview(np.ascontiguousarray(arr)).cast("B")
+        else:
+            codec, blob = _encode_delta(arr, base.arrays.get(name))
+        entries.append({"name": name, "dtype": arr.dtype.str, "shape": list(arr.shape),
+                        "nbytes": len(blob), "codec": codec})
+        blobs.append(blob)
+
+    offset = 0  # relative to the first blob, which follows the header on a 64-byte boundary
+    for entry in entries:
+        entry["offset"] = offset
+        offset = _align(offset + entry["nbytes"])
+    header = json.dumps({"kind": "full" if base is None else "delta", "base": base_name,
+                         "scalars": snap.scalars, "arrays": entries}, separators=(",", ":")).encode()
+    data_start = _align(_PREFIX.size + len(header))
+
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_PREFIX.pack(MAGIC, SNAPSHOT_VERSION, len(header)))
+            f.write(header)
+            for entry, blob in zip(entries, blobs):
+                f.seek(data_start + entry["offset"])
+                f.write(blob)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def read_snapshot(path):
+    """
+    Load a snapshot. Full snapshots are memory-mapped; deltas pull in their keyframe.
+    Raises OSError if the file cannot be read and ValueError if it is not a valid snapshot.
+    """
+    try:
+        return _read_snapshot(path)
+    except (struct.error, zlib.error, json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError) as e:
+        raise ValueError(f"{path} is truncated or corrupt: {e}") from e
+
+
+def _read_snapshot(path, base_of=None):
+    with open(path, "rb") as f:
+        magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Celestial Body Finder snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {version}")
+        header = json.loads(f.read(header_len))
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    data_start = _align(_PREFIX.size + header_len)
+
+    base_arrays = None
+    if header["kind"] == "delta":
+        if base_of is not None:  # also catches a delta naming itself as its base
+            raise ValueError(f"{base_of} is a delta against {path}, which is not a full snapshot")
+        base_path = os.path.join(os.path.dirname(path), header["base"])
+        base_arrays = _read_snapshot(base_path, base_of=path).arrays
+    arrays = {}
+    for entry in header["arrays"]:
+        start = data_start + entry["offset"]
+        blob = memoryview(data)[start:start + entry["nbytes"]]
+        arrays[entry["name"]] = _decode(entry, blob, base_arrays)
+    return Snapshot(header["scalars"], arrays, header["kind"], header["base"], path)
+
+
+def save(session, path):
+    """Full snapshot of session to path."""
+    return write_snapshot(path, capture(session))
+
+
+def load(session, path):
+    """Restore session from a snapshot file, or from the newest checkpoint in a directory."""
+    if os.path.isdir(path):
+        found = latest_checkpoint(path)
+        if found is None:
+            raise FileNotFoundError(f"No checkpoints in {path}")
+        path = found
+    snap = read_snapshot(path)
+    restore(session, snap)
+    return snap
+
+
+# ---------- checkpoints ----------
+def checkpoint_name(seq, frame):
+    return f"ckpt-{seq:08d}-{frame:010d}{SUFFIX}"
+
+
+def checkpoint_seq(name):
+    """Write sequence number of a checkpoint file name; -1 for unsequenced (older) names."""
+    parts = os.path.basename(name)[len("ckpt-"):-len(SUFFIX)].split("-")
+    return int(parts[0]) if len(parts) == 2 and parts[0].isdigit() else -1
+
+
+def list_checkpoints(directory):
+    """Checkpoint paths in directory, oldest write first."""
+    names = [name for name in os.listdir(directory) if name.startswith("ckpt-") and name.endswith(SUFFIX)]
+    return [os.path.join(directory, name) for name in sorted(names, key=lambda n: (checkpoint_seq(n), n))]
+
+
+def latest_checkpoint(directory):
+    """The most recently written checkpoint (not the highest frame: restores go back in time)."""
+    found = list_checkpoints(directory)
+    return found[-1] if found else None
+
+
+class Checkpointer:
+    """
+    Periodic checkpoints of a running session into directory.
+
+    maybe_save(session) is called once per frame (SimulationSession.simulate_frame does it
+    while session.checkpointer is set). State is captured on the calling thread so it is
+    consistent; encoding and writing happen on a background thread. If the previous
+    checkpoint is still being written, the new one is skipped rather than stalling a frame.
+    A failed write (disk full, ...) is counted in stats() and the next checkpoint is written
+    as a fresh keyframe, as is the first one after the frame number goes backwards (a
+    snapshot restore).
+    """
+
+    def __init__(self, directory, every=CHECKPOINT_EVERY, keyframe_every=KEYFRAME_EVERY,
+                 keep_keyframes=KEEP_KEYFRAMES):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.every = max(1, int(every))
+        self.keyframe_every = max(1, int(keyframe_every))
+        self.keep_keyframes = max(1, int(keep_keyframes))
+        self.written = self.skipped = self.failed = 0
+        self.last_error = None
+        self.bytes_written = 0
+        self.last_write_ms = 0.0
+        self._count = 0
+        self._keyframe = None        # (Snapshot, file name) deltas are taken against
+        self._keyframes = []         # file names of keyframes still on disk
+        self._last_frame = None
+        found = list_checkpoints(directory)
+        self._seq = checkpoint_seq(found[-1]) + 1 if found else 0
+        self._queue = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._run, name="checkpointer", daemon=True)
+        self._thread.start()
+
+    def maybe_save(self, session):
+        if session.frame_index % self.every or self._queue.full():
+            if not session.frame_index % self.every:
+                self.skipped += 1
+            return False
+        self._queue.put(capture(session))
+        return True
+
+    def close(self):
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            snap = self._queue.get()
+            if snap is None:
+                return
+            try:
+                self._write(snap)
+            except Exception as e:  # keep checkpointing; the next one starts a new keyframe
+                self.failed += 1
+                self.last_error = str(e)
+                self._keyframe = None
+                print(f"[checkpoint] frame {snap.frame} not written: {e}", file=sys.stderr)
+
+    def _write(self, snap):
+        t0 = time.perf_counter()
+        if self._last_frame is not None and snap.frame <= self._last_frame:
+            self._keyframe, self._count = None, 0  # restored to an earlier frame: new chain
+        self._last_frame = snap.frame
+        name = checkpoint_name(self._seq, snap.frame)
+        self._seq += 1
+        path = os.path.join(self.directory, name)
+        if self._keyframe is None or self._count % self.keyframe_every == 0 or self._keyframe[1] == name:
+            write_snapshot(path, snap)
+            self._keyframe = (snap, name)
+            self._keyframes.append(name)
+            self._prune()
+        else:
+            write_snapshot(path, snap, base=self._keyframe[0], base_name=self._keyframe[1])
+        self._count += 1
+        self.written += 1
+        self.bytes_written += os.path.getsize(path)
+        self.last_write_ms = (time.perf_counter() - t0) * 1000
+
+    def _prune(self):
+        """Drop every checkpoint older than the oldest keyframe we keep."""
+        if len(self._keyframes) <= self.keep_keyframes:
+            return
+        self._keyframes = self._keyframes[-self.keep_keyframes:]
+        oldest = checkpoint_seq(self._keyframes[0])
+        for path in list_checkpoints(self.directory):
+            if checkpoint_seq(path) < oldest:
+                os.remove(path)
+
+    def stats(self):
+        return {"written": self.written, "skipped": self.skipped, "failed": self.failed,
+                "mb_written": round(self.bytes_written / 1e6, 1), "last_write_ms": round(self.last_write_ms, 1)}
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Describe a snapshot and time restoring it.")
+    ap.add_argument("path", help="snapshot file, or a checkpoint directory (newest checkpoint)")
+    args = ap.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from session import SimulationSession
+    session = SimulationSession()
+    t0 = time.perf_counter()
+    snap = load(session, args.path)
+    dt = time.perf_counter() - t0
+    s = snap.scalars
+    print(f"{snap.path}: {snap.kind} snapshot" + (f" (base {snap.base})" if snap.base else ""))
+    print(f"frame {s['frame_index']}  day {s['sim_days']:,.1f}  time_factor {s['time_factor']}  "
+          f"paused {s['is_paused']}  belt {s['belt']:,}")
+    print(f"restored in {dt * 1000:.1f} ms  checksum {session.state_checksum()}")
+    session.disable_belt()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
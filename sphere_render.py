@@ -0,0 +1,187 @@
+# sphere_render.py
+# CPU-only textured 3-D sphere renderer for the selected body (no GPU, no Matplotlib).
+# Each output size gets a precomputed ray-sphere lookup table: which pixels hit the sphere,
+# which texel each one sees and its Lambert shading. Spinning the planet is then just an
+# offset on the texture column index, so a frame is one gather + one multiply in NumPy.
+# Run this file directly for a throughput benchmark.
+
+import os, zlib
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+TEXTURE_SIZE = (512, 256)        # (width, height) of generated equirectangular textures
+ROTATION_STEPS = 256             # quantised spin positions per revolution (cache granularity)
+CACHE_BYTES = 64 * 2 ** 20       # frame cache budget: every spin step of two bodies at 160 px
+LIGHT_DIR = (-0.55, -0.35, 0.76)  # towards the viewer and up-left, in screen space (x right, y down)
+AMBIENT = 0.12
+
+
+@lru_cache(maxsize=8)
+def sphere_lut(size, tex_w, tex_h):
+    """
+    Lookup table for a size x size view of a unit sphere, indexed in surfarray (x, y) order.
+
+    Returns (pixel_index, texel_row_base, texel_col, shade): flat indices of the pixels
+    covered by the sphere, the flattened texture offset of each pixel's texel row, its
+    texel column at zero rotation, and its Lambert shade factor.
+    """
+    c = (size - 1) / 2.0
+    r = size / 2.0
+    xs = (np.arange(size, dtype=np.float32) - c) / r
+    nx, ny = np.meshgrid(xs, xs, indexing="ij")  # [x, y] like pygame.surfarray
+    d2 = nx * nx + ny * ny
+    hit = d2 < 1.0
+    nx, ny = nx[hit], ny[hit]
+    nz = np.sqrt(1.0 - d2[hit])
+
+    lon = np.arctan2(nx, nz)                      # -pi..pi, 0 faces the viewer
+    lat = np.arcsin(np.clip(-ny, -1.0, 1.0))      # +pi/2 at the top
+    col = ((lon / (2 * np.pi) + 0.5) * tex_w).astype(np.int32) % tex_w
+    row = np.clip(((0.5 - lat / np.pi) * tex_h).astype(np.int32), 0, tex_h - 1)
+
+    light = np.asarray(LIGHT_DIR, dtype=np.float32)
+    light /= np.linalg.norm(light)
+    lambert = np.maximum(nx * light[0] + ny * light[1] + nz * light[2], 0.0)
+    shade = (AMBIENT + (1.0 - AMBIENT) * lambert).astype(np.float32)
+
+    return np.flatnonzero(hit), row * tex_w, col, shade
+
+
+def _smooth_noise(rng, w, h, cells_x, cells_y):
+    """Bilinearly upsampled value noise in 0..1, wrapping horizontally."""
+    grid = rng.random((cells_y + 1, cells_x + 1)).astype(np.float32)
+    grid[:, -1] = grid[:, 0]
+    gx = np.linspace(0, cells_x, w, endpoint=False, dtype=np.float32)
+    gy = np.linspace(0, cells_y, h, dtype=np.float32)
+    x0 = gx.astype(np.int32); y0 = np.minimum(gy.astype(np.int32), cells_y - 1)
+    fx = gx - x0; fy = (gy - y0)[:, None]
+    top = grid[y0][:, x0] * (1 - fx) + grid[y0][:, x0 + 1] * fx
+    bottom = grid[y0 + 1][:, x0] * (1 - fx) + grid[y0 + 1][:, x0 + 1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def procedural_texture(name, color, banded=False, size=TEXTURE_SIZE):
+    """Deterministic stand-in texture built from the body's display colour."""
+    w, h = size
+    rng = np.random.default_rng(zlib.crc32(name.encode()))
+    noise = 0.6 * _smooth_noise(rng, w, h, 16, 8) + 0.4 * _smooth_noise(rng, w, h, 64, 32)
+    if banded:
+        lat = np.linspace(-1.0, 1.0, h, dtype=np.float32)[:, None]
+        value = 0.7 + 0.2 * np.sin(lat * 14.0 + noise * 2.0) + 0.1 * noise
+    else:
+        value = 0.55 + 0.45 * noise
+    tex = np.clip(value[..., None] * np.asarray(color, dtype=np.float32), 0, 255)
+    return tex.astype(np.uint8)
+
+
+@lru_cache(maxsize=None)
+def load_texture(name, color, banded=False, asset_dir="assets"):
+    """
+    assets/<name>_texture.jpg if Pillow can read it, otherwise a procedural texture.
+    Cached per process and shared between renderers, so treat the array as read-only.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), asset_dir,
+                        f"{name.lower()}_texture.jpg")
+    if os.path.exists(path):
+        try:
+            from PIL import Image
+            im = Image.open(path).convert("RGB").resize(TEXTURE_SIZE)
+            return np.asarray(im, dtype=np.uint8)
+        except Exception:
+            pass
+    return procedural_texture(name, color, banded)
+
+
+class SphereRenderer:
+    """
+    Renders bodies as shaded, textured spheres with an LRU cache of finished frames keyed
+    by (body name, size, rotation step) and bounded by their total pixel bytes, so large
+    views hold fewer frames rather than more memory. Textures are loaded once per body.
+    """
+
+    def __init__(self, cache_bytes=CACHE_BYTES, rotation_steps=ROTATION_STEPS):
+        self.cache_bytes = cache_bytes
+        self.rotation_steps = rotation_steps
+        self._textures = {}
+        self._cache = OrderedDict()  # key -> (surface, nbytes)
+        self.cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def texture_for(self, body):
+        tex = self._textures.get(body.name)
+        if tex is None:
+            tex = load_texture(body.name, body.color, banded=_is_banded(body))
+            # Flattened (texels, 3) view so a frame is a single np.take.
+            self._textures[body.name] = tex = (tex.reshape(-1, 3), tex.shape[1], tex.shape[0])
+        return tex
+
+    def rotation_step(self, angle):
+        return int(angle / (2 * np.pi) * self.rotation_steps) % self.rotation_steps
+
+    def render_array(self, body, size, step):
+        """(size, size, 3) uint8 array in surfarray (x, y) order; black outside the disc."""
+        flat_tex, tex_w, tex_h = self.texture_for(body)
+        pixels, row_base, col, shade = sphere_lut(size, tex_w, tex_h)
+
+        col = col + (step * tex_w) // self.rotation_steps
+        col[col >= tex_w] -= tex_w
+        rgb = np.take(flat_tex, row_base + col, axis=0)
+        if not _is_emissive(body):
+            rgb = (rgb * shade[:, None]).astype(np.uint8)
+
+        out = np.zeros((size * size, 3), dtype=np.uint8)
+        out[pixels] = rgb
+        return out.reshape(size, size, 3)
+
+    def render(self, body, size, angle):
+        """Cached pygame Surface of body at spin angle (radians); black is the colour key."""
+        key = (body.name, size, self.rotation_step(angle))
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        import pygame
+        self.misses += 1
+        surface = pygame.surfarray.make_surface(self.render_array(body, size, key[2]))
+        surface.set_colorkey((0, 0, 0))
+        nbytes = surface.get_pitch() * surface.get_height()
+        self._cache[key] = (surface, nbytes)
+        self.cached_bytes += nbytes
+        while self.cached_bytes > self.cache_bytes and len(self._cache) > 1:
+            self.cached_bytes -= self._cache.popitem(last=False)[1][1]
+        return surface
+
+
+def prewarm(bodies, size):
+    """Build the lookup table for size and every body's texture before the first render needs them."""
+    sphere_lut(size, *TEXTURE_SIZE)
+    for body in bodies:
+        load_texture(body.name, body.color, banded=_is_banded(body))
+
+
+def _is_banded(body):
+    return body.has_rings or body.radius >= 15
+
+
+def _is_emissive(body):
+    return "Type: Star" in body.info_text
+
+
+if __name__ == "__main__":
+    import time
+    from simulation import SOLAR_SYSTEM
+
+    renderer = SphereRenderer()
+    for name in ("earth", "jupiter", "sun"):
+        body = SOLAR_SYSTEM[name]
+        renderer.render_array(body, 512, 0)  # build LUT + texture
+        frames, t0 = 120, time.perf_counter()
+        for i in range(frames):
+            renderer.render_array(body, 512, i % renderer.rotation_steps)
+        dt = time.perf_counter() - t0
+        print(f"{body.name:8s} 512x512 uncached: {frames / dt:6.1f} FPS ({dt / frames * 1000:.2f} ms/frame)")
@@ -0,0 +1,30 @@
+# test_events.py
+# Alignment windows found from the coarse samples against a much finer sampling.
+#
+#   python -m pytest -q test_events.py
+
+import math
+
+import numpy as np
+import pytest
+
+from events import EventFinder
+
+
+def _fine_windows(finder, end, width_deg, k, oversample=64):
+    """Runs of fine samples inside the sector: the windows a brute-force search would report."""
+    idx = np.array([i for i in range(len(finder.orbits.names)) if finder.orbits.radius[i] > 0])
+    t = np.arange(0.0, end, finder.step / oversample)
+    inside = finder._tightest_group(t, idx, k)[0] <= math.radians(width_deg)
+    return int(np.count_nonzero(np.diff(inside.astype(np.int8)) == 1) + inside[0])
+
+
+@pytest.mark.parametrize("width_deg, k", [(30.0, 3), (10.0, 2), (45.0, 4)])
+def test_alignments_match_fine_sampling(width_deg, k):
+    finder = EventFinder()
+    events = finder.alignments(0, 7300, width_deg=width_deg, min_bodies=k)
+    assert len(events) == _fine_windows(finder, 7300, width_deg, k)
+    for e in events:
+        assert e.window[0] <= e.day <= e.window[1]
+        assert e.angle <= width_deg + 1e-6
+    assert all(a.window[1] <= b.window[0] for a, b in zip(events, events[1:]))
@@ -0,0 +1,26 @@
+# test_query_cli.py
+# Filter semantics of query_cli.QueryEngine.
+#
+#   python -m pytest -q test_query_cli.py
+
+from query_cli import QueryEngine
+
+
+def _names(engine, where):
+    return sorted(row["name"] for row in engine.query(where, ["name"]))
+
+
+def test_string_ordering_ignores_case():
+    engine = QueryEngine()
+    everything = _names(engine, {})
+    for op, keep in (("lt", lambda n: n.lower() < "mars"), ("lte", lambda n: n.lower() <= "mars"),
+                     ("gt", lambda n: n.lower() > "mars"), ("gte", lambda n: n.lower() >= "mars")):
+        expected = [name for name in everything if keep(name)]
+        assert expected and expected != everything
+        for operand in ("Mars", "mars", "MARS"):
+            assert _names(engine, {"name": {op: operand}}) == expected, (op, operand)
+
+
+def test_ordering_bounds_combine():
+    engine = QueryEngine()
+    assert _names(engine, {"name": {"gte": "Earth", "lt": "N"}}) == ["Earth", "Jupiter", "Mars", "Mercury", "Moon"]
@@ -0,0 +1,55 @@
+# test_query_server.py
+# Cache-key normalisation and parameter validation for query_server.QueryService.
+#
+#   python -m pytest -q test_query_server.py
+
+import asyncio, json
+from urllib.parse import quote
+
+from query_cli import normalise_where
+from query_server import QueryService
+
+
+def _get(service, target, body=b""):
+    method = "POST" if body else "GET"
+    status, payload, _ = asyncio.run(service.dispatch(method, target, body))
+    return status, json.loads(payload)
+
+
+def _query(service, where, **extra):
+    query = "&".join([f"where={quote(json.dumps(where))}"] + [f"{k}={v}" for k, v in extra.items()])
+    return _get(service, f"/query?{query}")
+
+
+def test_normalise_where_folds_like_the_engine():
+    assert normalise_where({"type": "Planet"}) == {"type": {"eq": "planet"}}
+    assert normalise_where({"name": {"in": ["Mars", 3]}, "type": {"ne": "Moon"}}) == \
+        {"name": {"in": ["mars", 3]}, "type": {"ne": "moon"}}
+    assert normalise_where({"name": {"gt": "Z", "contains": "AR"}, "moons": {"gte": 2}}) == \
+        {"moons": {"gte": 2}, "name": {"contains": "ar", "gt": "z"}}
+
+
+def test_equivalent_filters_share_a_cache_entry():
+    service = QueryService()
+    _, first = _query(service, {"type": "Planet"})
+    _, second = _query(service, {"type": {"eq": "PLANET"}})
+    assert first == second
+    assert (service.cache.hits, service.cache.misses) == (1, 1)
+
+
+def test_filters_differing_only_in_case_share_a_cache_entry():
+    service = QueryService()
+    fresh = _query(QueryService(), {"name": {"lte": "mars"}})[1]
+    assert fresh["result"]
+    for operand in ("Mars", "mars", "MARS"):
+        assert _query(service, {"name": {"lte": operand}})[1] == fresh
+    assert (service.cache.hits, service.cache.misses) == (2, 1)
+
+
+def test_bad_limits_are_client_errors():
+    service = QueryService()
+    assert _query(service, {}, limit="nan")[0] == 400
+    assert _query(service, {}, limit="1.5")[0] == 400
+    assert len(_query(service, {}, limit="2")[1]["result"]) == 2
+    body = json.dumps({"where": {}, "limit": [1]}).encode()
+    assert _get(service, "/query", body)[0] == 400
@@ -0,0 +1,61 @@
+# test_snapshot.py
+# Checkpoint chains across a restore that moves the frame number back.
+#
+#   python -m pytest -q test_snapshot.py
+
+import os, time
+
+import pytest
+
+import snapshot
+from session import SimulationSession
+
+
+def _run(session, checkpointer, frames):
+    """Advance frame_index like simulate_frame does and wait for each checkpoint to land."""
+    for _ in range(frames):
+        session.frame_index += 1
+        session.sim_days += session.time_factor
+        expected = checkpointer.written + checkpointer.failed + 1
+        if checkpointer.maybe_save(session):
+            deadline = time.monotonic() + 5.0
+            while checkpointer.written + checkpointer.failed < expected:
+                assert time.monotonic() < deadline, "checkpoint not written"
+                time.sleep(0.001)
+
+
+def test_load_continue_reload(tmp_path):
+    directory = str(tmp_path)
+    session = SimulationSession(star_seed=1)
+    checkpointer = snapshot.Checkpointer(directory, every=10, keyframe_every=3)
+    try:
+        _run(session, checkpointer, 30)                    # frames 10 (key), 20, 30
+        first = snapshot.list_checkpoints(directory)
+        snapshot.load(session, first[0])                   # back to frame 10
+        _run(session, checkpointer, 20)                    # frames 20, 30 again
+    finally:
+        checkpointer.close()
+    assert checkpointer.failed == 0
+
+    written = snapshot.list_checkpoints(directory)
+    assert len(written) == 5 and len(set(written)) == 5    # nothing overwritten
+    for path in written:
+        snap = snapshot.read_snapshot(path)
+        if snap.kind == "delta":
+            assert snap.base != os.path.basename(path)
+
+    latest = snapshot.latest_checkpoint(directory)
+    assert latest == written[-1]
+    restored = SimulationSession(star_seed=1)
+    snapshot.load(restored, directory)
+    assert restored.frame_index == 30 and restored.sim_days == session.sim_days
+    assert restored.state_checksum() == session.state_checksum()
+
+
+def test_self_referencing_delta_is_a_value_error(tmp_path):
+    session = SimulationSession(star_seed=1)
+    base = snapshot.capture(session)
+    path = str(tmp_path / snapshot.checkpoint_name(0, 10))
+    snapshot.write_snapshot(path, base, base=base, base_name=os.path.basename(path))
+    with pytest.raises(ValueError):
+        snapshot.read_snapshot(path)